@@ -0,0 +1,82 @@
+"""
+Benchmark enqueue/dequeue cost of CrawlFrontier against the old list-based
+to_visit queue used by SeedCrawler.
+
+Usage (from the repository root):
+    python benchmarks/bench_crawl_frontier.py --sizes 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pipeline'))
+
+from crawl_frontier import CrawlFrontier
+
+
+def make_urls(n: int):
+    return [f"https://example{i % 997}.org/page/{i}?ref={i * 7919 % 100003}" for i in range(n)]
+
+
+def bench_list(urls):
+    """The previous SeedCrawler pattern: `in` checks on a list and pop(0)."""
+    to_visit, visited = [], set()
+    start = time.perf_counter()
+    for url in urls:
+        if url not in visited and url not in to_visit:
+            to_visit.append(url)
+    enqueue = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while to_visit:
+        visited.add(to_visit.pop(0))
+    dequeue = time.perf_counter() - start
+    return enqueue, dequeue, None
+
+
+def bench_frontier(urls, prioritize_depth=False):
+    frontier = CrawlFrontier(prioritize_depth=prioritize_depth)
+    start = time.perf_counter()
+    for i, url in enumerate(urls):
+        frontier.push(url, i % 5)
+    enqueue = time.perf_counter() - start
+    memory = frontier.memory_usage()
+
+    start = time.perf_counter()
+    while frontier:
+        frontier.pop()
+    dequeue = time.perf_counter() - start
+    return enqueue, dequeue, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl frontier benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--list-limit", type=int, default=20000,
+                        help="Largest size to run the quadratic list baseline on")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        urls = make_urls(n)
+        runs = [("frontier_fifo", lambda: bench_frontier(urls)),
+                ("frontier_depth", lambda: bench_frontier(urls, prioritize_depth=True))]
+        if n <= args.list_limit:
+            runs.insert(0, ("list", lambda: bench_list(urls)))
+        for name, run in runs:
+            enqueue, dequeue, memory = run()
+            results.append({
+                "impl": name,
+                "urls": n,
+                "enqueue_us_per_url": round(enqueue / n * 1e6, 3),
+                "dequeue_us_per_url": round(dequeue / n * 1e6, 3),
+                "memory_mb": round(memory / 1e6, 1) if memory is not None else None,
+            })
+            print(json.dumps(results[-1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Throughput benchmark for the filtering hot path: trafilatura extraction plus
+fastText prediction, in each execution mode the pipeline supports.
+
+    sequential  one page after another in the main thread
+    threads     thread pool, extraction and model.predict in the threads
+    processes   LIDWorkerPool (language_detector.cpu_workers)
+    batched     thread pool extracting, predictions through BatchingPredictor
+
+Each mode runs in its own subprocess so peak RSS is measured per mode. At most
+`2 * workers` pages are in flight at a time; latency is measured from handing
+a page to the mode until its prediction is available.
+
+Usage (from the repository root):
+    python benchmarks/bench_lid_pipeline.py --corpus saved_pages/ --model pipeline/model_v3.bin
+    python benchmarks/bench_lid_pipeline.py --page-store output/page_store --modes threads processes --workers 32
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pipeline'))
+
+import fasttext
+import numpy as np
+from trafilatura import extract
+
+from bench_link_extractor import load_corpus, load_page_store
+from lid_batcher import BatchingPredictor
+from lid_workers import LIDWorkerPool
+
+MODES = ["sequential", "threads", "processes", "batched"]
+
+
+def classify(model, html):
+    text = extract(html) if html else None
+    if text is None:
+        return None
+    return model.predict(text.replace('\n', ''))
+
+
+def run_windowed(submit, pages, window):
+    latencies = []
+    pending = set()
+
+    def track(future, started):
+        future.add_done_callback(lambda _: latencies.append(time.perf_counter() - started))
+        return future
+
+    start = time.perf_counter()
+    for _, html in pages:
+        if len(pending) >= window:
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        started = time.perf_counter()
+        pending.add(track(submit(html), started))
+    wait(pending)
+    return time.perf_counter() - start, latencies
+
+
+def run_mode(mode, model, pages, workers, batch_size):
+    window = 2 * workers
+    if mode == "sequential":
+        def submit(html):
+            future = Future()
+            future.set_result(classify(model, html))
+            return future
+        return run_windowed(submit, pages, 1)
+
+    if mode == "processes":
+        pool = LIDWorkerPool(model, processes=workers)
+        try:
+            return run_windowed(pool.submit, pages, window)
+        finally:
+            pool.close()
+
+    if mode == "batched":
+        batcher = BatchingPredictor(model, batch_size=batch_size)
+
+        def predict(html):
+            text = extract(html) if html else None
+            return batcher.predict(text.replace('\n', '')) if text is not None else None
+    else:
+        batcher = None
+
+        def predict(html):
+            return classify(model, html)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return run_windowed(lambda html: executor.submit(predict, html), pages, window)
+    finally:
+        if batcher is not None:
+            batcher.close()
+
+
+def measure(args):
+    pages = load_corpus(args.corpus, args.limit) if args.corpus else load_page_store(args.page_store, args.limit)
+    if not pages:
+        sys.exit("No pages found in the corpus")
+    model = fasttext.load_model(args.model)
+    seconds, latencies = run_mode(args.mode, model, pages, args.workers, args.batch_size)
+    latencies_ms = np.array(latencies) * 1000
+    print(json.dumps({
+        "mode": args.mode,
+        "docs": len(pages),
+        "workers": 1 if args.mode == "sequential" else args.workers,
+        "corpus_mb": round(sum(len(html.encode('utf-8')) for _, html in pages) / 1e6, 2),
+        "seconds": round(seconds, 3),
+        "docs_per_s": round(len(pages) / seconds, 1) if seconds else None,
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_child_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction + LID throughput benchmark")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", help="Directory of saved HTML files")
+    source.add_argument("--page-store", help="Page store directory")
+    parser.add_argument("--model", default="model_v3.bin", help="fastText model file")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES, help="Execution modes to run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Threads / processes per mode")
+    parser.add_argument("--batch-size", type=int, default=64, help="Batch size of the batched mode")
+    parser.add_argument("--limit", type=int, default=2000, help="Maximum number of pages to load")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        measure(args)
+        return
+
+    for mode in args.modes:
+        source_args = ["--corpus", args.corpus] if args.corpus else ["--page-store", args.page_store]
+        subprocess.run([
+            sys.executable, os.path.abspath(__file__), *source_args,
+            "--model", args.model, "--workers", str(args.workers), "--batch-size", str(args.batch_size),
+            "--limit", str(args.limit), "--mode", mode
+        ], check=True)
+
+
+if __name__ == "__main__":
+    main()
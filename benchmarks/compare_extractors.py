@@ -0,0 +1,122 @@
+"""
+Compare LID input from the fast lxml text pass (pipeline/text_extractor.py)
+with trafilatura extraction on saved pages: extraction throughput and how
+often the fastText decision changes.
+
+Three extractors are run over the same pages:
+
+    trafilatura  full boilerplate removal (what the pipeline used so far)
+    fast         the lxml pass alone
+    tiered       the lxml pass, falling back to trafilatura below --min-chars
+
+The report gives pages/s and MB/s per extractor, the tiered fallback rate,
+and for fast and tiered the top-1 label agreement with trafilatura's text,
+the mean absolute confidence difference and, with --target, accept/reject
+agreement at --minimum-confidence.
+
+Usage (from the repository root):
+    python benchmarks/compare_extractors.py --corpus saved_pages/ --model pipeline/model_v3.bin --target bpy_Beng
+    python benchmarks/compare_extractors.py --page-store output/page_store --min-chars 300
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pipeline'))
+
+import fasttext
+import numpy as np
+from trafilatura import extract
+
+from bench_link_extractor import load_corpus, load_page_store
+from lid_labels import LabelTable, accepted
+from text_extractor import TIER_FULL, TieredExtractor, fast_text
+
+
+def run(name, func, pages):
+    start = time.perf_counter()
+    texts = [func(html) for _, html in pages]
+    elapsed = time.perf_counter() - start
+    total_bytes = sum(len(html.encode('utf-8')) for _, html in pages)
+    return texts, {
+        "extractor": name,
+        "pages": len(pages),
+        "seconds": round(elapsed, 3),
+        "pages_per_s": round(len(pages) / elapsed, 1) if elapsed else None,
+        "mb_per_s": round(total_bytes / 1e6 / elapsed, 2) if elapsed else None,
+        "empty": sum(1 for text in texts if not text),
+    }
+
+
+def predict(model, table, texts):
+    predictions = [model.predict(text.replace('\n', '')) for text in texts]
+    return table.topk([labels for labels, _ in predictions], [probs for _, probs in predictions])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast text pass vs trafilatura as LID input")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", help="Directory of saved HTML files")
+    source.add_argument("--page-store", help="Page store directory")
+    parser.add_argument("--model", default="model_v3.bin", help="fastText model file")
+    parser.add_argument("--target", help="Language code for accept/reject agreement, e.g. bpy_Beng")
+    parser.add_argument("--minimum-confidence", type=float, default=0.7, help="Acceptance threshold")
+    parser.add_argument("--min-chars", type=int, default=200, help="Tiered: fall back to trafilatura below this")
+    parser.add_argument("--min-block-chars", type=int, default=30, help="Fast pass: shortest block kept")
+    parser.add_argument("--max-link-density", type=float, default=0.5, help="Fast pass: largest link share kept")
+    parser.add_argument("--limit", type=int, default=2000, help="Maximum number of pages to load")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus, args.limit) if args.corpus else load_page_store(args.page_store, args.limit)
+    if not pages:
+        sys.exit("No pages found in the corpus")
+
+    tiered = TieredExtractor(args.min_chars, args.min_block_chars, args.max_link_density)
+    tiers = []
+
+    def tiered_text(html):
+        text, tier = tiered.lid_text(html)
+        tiers.append(tier)
+        return text
+
+    full_texts, full_report = run("trafilatura", extract, pages)
+    fast_texts, fast_report = run(
+        "fast", lambda html: fast_text(html, args.min_block_chars, args.max_link_density), pages
+    )
+    tiered_texts, tiered_report = run("tiered", tiered_text, pages)
+    tiered_report["fallback_rate"] = round(tiers.count(TIER_FULL) / len(tiers), 4)
+    for report in (full_report, fast_report, tiered_report):
+        print(json.dumps(report))
+
+    # Decisions are compared on pages trafilatura finds text in, like the pipeline does
+    rows = [i for i, text in enumerate(full_texts) if text]
+    if not rows:
+        sys.exit("trafilatura extracted no text from any page")
+    model = fasttext.load_model(args.model)
+    table = LabelTable.from_model(model)
+    full_codes, full_probs = predict(model, table, [full_texts[i] for i in rows])
+    full_accept = accepted(full_codes, full_probs, args.target, args.minimum_confidence) if args.target else None
+
+    for name, texts in (("fast", fast_texts), ("tiered", tiered_texts)):
+        codes, probs = predict(model, table, [texts[i] or '' for i in rows])
+        comparison = {
+            "extractor": name,
+            "compared_pages": len(rows),
+            "top1_agreement": round(float(np.mean(codes[:, 0] == full_codes[:, 0])), 4),
+            "mean_abs_confidence_diff": round(float(np.mean(np.abs(probs[:, 0] - full_probs[:, 0]))), 4),
+        }
+        if full_accept is not None:
+            accept = accepted(codes, probs, args.target, args.minimum_confidence)
+            comparison.update({
+                "decision_agreement": round(float(np.mean(accept == full_accept)), 4),
+                "accept_to_reject": int(np.sum(full_accept & ~accept)),
+                "reject_to_accept": int(np.sum(~full_accept & accept)),
+            })
+        print(json.dumps(comparison))
+
+
+if __name__ == "__main__":
+    main()
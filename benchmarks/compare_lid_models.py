@@ -0,0 +1,140 @@
+"""
+Compare the quantized LID model against the full one on pages the pipeline
+already classified, and optionally create the quantized model first.
+
+Pages come from the crawler's metadata files (<output>/meta_data/*_meta_data.json):
+links that were accepted (`filtered_links`) and seed links that were rejected
+(`rejected_links`) for each language. Their text is taken from the crawler
+output when it was saved, otherwise extracted from the page store.
+
+For each model the report gives file size, resident memory added by loading
+it, load time and docs/s; the comparison gives top-1 agreement, accept/reject
+agreement at `minimum_confidence`, the decisions that flipped and the mean
+absolute confidence difference.
+
+Usage (from the repository root):
+    python benchmarks/compare_lid_models.py --full pipeline/model_v3.bin --quantized pipeline/model_v3.ftz \\
+        --output-dir pipeline/output/crawled --page-store pipeline/output/page_store
+    python benchmarks/compare_lid_models.py --full pipeline/model_v3.bin --quantized pipeline/model_v3.ftz --quantize ...
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pipeline'))
+
+import fasttext
+import numpy as np
+from trafilatura import extract
+
+from lid_model import rss_mb
+from lid_labels import LabelTable, accepted
+from page_store import PageStore
+
+
+def load_samples(output_dir, page_store, limit):
+    """`(target_label, text, was_accepted)` for accepted and rejected links in the metadata files."""
+    samples = []
+    for meta_path in sorted(glob.glob(os.path.join(output_dir, 'meta_data', '*_meta_data.json'))):
+        label = os.path.basename(meta_path)[:-len('_meta_data.json')]
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+
+        saved_texts = {}
+        output_path = os.path.join(output_dir, f"{label}_crawled_output.json")
+        if os.path.exists(output_path):
+            with open(output_path, 'r', encoding='utf-8') as file:
+                saved_texts = {entry['link']: entry.get('text') for entry in json.load(file)}
+
+        for links, was_accepted in ((meta.get('filtered_links', []), True), (meta.get('rejected_links', []), False)):
+            for link in links:
+                text = saved_texts.get(link)
+                if not text and page_store is not None:
+                    html = page_store.get_html(link)
+                    text = extract(html) if html else None
+                if text:
+                    samples.append((label, text.replace('\n', ''), was_accepted))
+                if len(samples) >= limit:
+                    return samples
+    return samples
+
+
+def evaluate(path, texts):
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    model = fasttext.load_model(path)
+    load_seconds = time.perf_counter() - start
+    rss_added = rss_mb() - rss_before
+
+    table = LabelTable.from_model(model)
+    start = time.perf_counter()
+    predictions = [model.predict(text) for text in texts]
+    seconds = time.perf_counter() - start
+    codes, probabilities = table.topk([labels for labels, _ in predictions],
+                                      [probs for _, probs in predictions])
+    report = {
+        "model": path,
+        "file_mb": round(os.path.getsize(path) / 1e6, 1),
+        "rss_added_mb": round(rss_added, 1),
+        "load_s": round(load_seconds, 2),
+        "docs_per_s": round(len(texts) / seconds, 1) if seconds else None,
+    }
+    return codes, probabilities, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs quantized LID model comparison")
+    parser.add_argument("--full", required=True, help="Full fastText model (.bin)")
+    parser.add_argument("--quantized", required=True, help="Quantized fastText model (.ftz)")
+    parser.add_argument("--quantize", action="store_true", help="Create --quantized from --full first")
+    parser.add_argument("--cutoff", type=int, default=0, help="Vocabulary cutoff when quantizing (0 keeps all)")
+    parser.add_argument("--dsub", type=int, default=2, help="Product-quantization subvector size when quantizing")
+    parser.add_argument("--output-dir", default="output/crawled", help="Crawler output directory with meta_data/")
+    parser.add_argument("--page-store", help="Page store directory, for pages whose text was not saved")
+    parser.add_argument("--minimum-confidence", type=float, default=0.7, help="Acceptance threshold")
+    parser.add_argument("--limit", type=int, default=5000, help="Maximum number of pages")
+    args = parser.parse_args()
+
+    if args.quantize:
+        # Without retraining, quantization needs no training data
+        model = fasttext.load_model(args.full)
+        model.quantize(cutoff=args.cutoff, dsub=args.dsub, retrain=False)
+        model.save_model(args.quantized)
+        del model
+        print(json.dumps({"quantized": args.quantized, "file_mb": round(os.path.getsize(args.quantized) / 1e6, 1)}))
+
+    page_store = PageStore(args.page_store) if args.page_store else None
+    samples = load_samples(args.output_dir, page_store, args.limit)
+    if not samples:
+        sys.exit("No classified pages found in the metadata files")
+    targets = np.array([label for label, _, _ in samples], dtype=object)
+    texts = [text for _, text, _ in samples]
+    recorded = np.array([was_accepted for _, _, was_accepted in samples])
+
+    # Smaller model first, so its RSS figure is not inflated by freed pages of the full one
+    quantized_codes, quantized_probs, quantized_report = evaluate(args.quantized, texts)
+    full_codes, full_probs, full_report = evaluate(args.full, texts)
+
+    full_accept = accepted(full_codes, full_probs, targets, args.minimum_confidence)
+    quantized_accept = accepted(quantized_codes, quantized_probs, targets, args.minimum_confidence)
+    print(json.dumps(full_report))
+    print(json.dumps(quantized_report))
+    print(json.dumps({
+        "docs": len(samples),
+        "recorded_accepted": int(recorded.sum()),
+        "top1_agreement": round(float(np.mean(full_codes[:, 0] == quantized_codes[:, 0])), 4),
+        "decision_agreement": round(float(np.mean(full_accept == quantized_accept)), 4),
+        "accept_to_reject": int(np.sum(full_accept & ~quantized_accept)),
+        "reject_to_accept": int(np.sum(~full_accept & quantized_accept)),
+        "mean_abs_confidence_diff": round(float(np.mean(np.abs(full_probs[:, 0] - quantized_probs[:, 0]))), 4),
+        "full_matches_recorded": round(float(np.mean(full_accept == recorded)), 4),
+        "quantized_matches_recorded": round(float(np.mean(quantized_accept == recorded)), 4),
+    }))
+
+
+if __name__ == "__main__":
+    main()
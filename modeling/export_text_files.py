@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Export per-language text files for language modeling from the page store.
+
+For every crawled link of a language, the stored HTML is read from the local
+page store and run through trafilatura. The extracted documents are written to
+`<text_files_directory>/<language>.txt`, which is the input expected by
+character_level_tokenize.py. Links missing from the store are skipped, so this
+step never goes back to the network.
+
+Pipeline: page store -> text files -> truncated text -> tokenized text
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import yaml
+from tqdm import tqdm
+from trafilatura import extract
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pipeline'))
+from page_store import PageStore
+
+
+def export_language(input_label: str, crawled_dir: str, output_file_name: str,
+                    text_dir: str, page_store: PageStore) -> int:
+    """
+    Write the extracted text of all crawled links of one language.
+
+    Args:
+        input_label (str): Language label, e.g. 'bpy_Beng'
+        crawled_dir (str): Directory holding the crawler output JSON files
+        output_file_name (str): Crawler output file pattern with a {language} field
+        text_dir (str): Directory where the text file is written
+        page_store (PageStore): Store holding the fetched pages
+
+    Returns:
+        int: Number of documents written
+    """
+    crawled_file = Path(crawled_dir) / output_file_name.format(language=input_label)
+    if not crawled_file.exists():
+        print(f"No crawled output for {input_label}: {crawled_file}", file=sys.stderr)
+        return 0
+
+    with open(crawled_file, 'r', encoding='utf-8') as file:
+        entries = json.load(file)
+
+    Path(text_dir).mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(Path(text_dir) / f"{input_label}.txt", 'w', encoding='utf-8') as file:
+        for entry in entries:
+            text = entry.get('text')
+            if not text:
+                html = page_store.get_html(entry['link'])
+                text = extract(html) if html is not None else None
+            if text:
+                file.write(text.strip() + "\n")
+                written += 1
+    return written
+
+
+def main():
+    """Export text files for the languages configured in pipeline/config.yaml."""
+    with open('pipeline/config.yaml', 'r') as file:
+        config = yaml.safe_load(file)
+
+    page_store = PageStore.from_config(config)
+    if page_store is None:
+        print("page_store is disabled in pipeline/config.yaml; nothing to export.", file=sys.stderr)
+        sys.exit(1)
+
+    if config['batch_processing']['enabled']:
+        input_labels = config['batch_processing']['input_labels']
+    else:
+        input_labels = [config['language_detector']['desired_language']]
+
+    for input_label in tqdm(input_labels, desc="Exporting text files"):
+        written = export_language(
+            input_label,
+            config['output']['directory'],
+            config['output']['output_file_name'],
+            config['output']['text_files_directory'],
+            page_store
+        )
+        print(f"{input_label}: {written} documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+STAGE_CRAWLING = "crawling"
+STAGE_FILTERING = "filtering"
+STAGE_DONE = "done"
+
+
+class CheckpointStore:
+    """
+    Per-language progress files for resuming batch runs.
+
+    Each language gets `<directory>/<label>.json` holding its current stage
+    ("crawling", "filtering" or "done") plus the state needed to continue
+    that stage: the crawl frontier, visited and discovered links while
+    crawling, and the already processed links and partial `filtered_links`
+    while filtering. Files are replaced atomically so a crash during a write
+    leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, directory: str, interval: int = 50):
+        self.directory = directory
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['CheckpointStore']:
+        """Build the store from the `checkpoint` config section, or None if it is disabled."""
+        checkpoint_config = config.get('checkpoint') or {}
+        if not checkpoint_config.get('enabled', False):
+            return None
+        return cls(checkpoint_config['directory'], checkpoint_config.get('interval', 50))
+
+    def path(self, input_label: str) -> str:
+        return os.path.join(self.directory, f"{input_label}.json")
+
+    def load(self, input_label: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(input_label), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            return None
+
+    def save(self, input_label: str, stage: str, **state) -> None:
+        state['stage'] = stage
+        state['updated_at'] = time.time()
+        path = self.path(input_label)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def mark_done(self, input_label: str) -> None:
+        # Drop the bulky crawl state once the language's outputs are written
+        self.save(input_label, STAGE_DONE)
+
+    def is_done(self, input_label: str) -> bool:
+        state = self.load(input_label)
+        return state is not None and state.get('stage') == STAGE_DONE
+
+
+def checkpoint_saver(checkpoints: Optional[CheckpointStore], input_label: str, stage: str, key: str,
+                     **fixed) -> Optional[Callable[[Any], None]]:
+    """
+    Callback that saves its argument under `key` (plus the `fixed` fields) as
+    `input_label`'s `stage` checkpoint, or None when checkpoints are disabled.
+    """
+    if checkpoints is None:
+        return None
+
+    def save(state) -> None:
+        checkpoints.save(input_label, stage, **fixed, **{key: state})
+    return save
@@ -0,0 +1,92 @@
+import heapq
+import itertools
+import sys
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+from visited_filter import url_set_memory
+
+
+class CrawlFrontier:
+    """
+    Queue of URLs still to crawl with O(1) enqueue, dequeue and membership.
+
+    Every URL ever pushed is remembered in `seen`, so a link that was already
+    queued or crawled is never queued again. By default URLs come out in FIFO
+    order; with `prioritize_depth=True` the shallowest URL is always served
+    first, even if deeper ones were pushed earlier. `seen` may be any
+    set-like container with `add` and `in`, e.g. a ScalableBloomFilter for
+    very large crawls.
+    """
+
+    def __init__(self, urls: Iterable[str] = (), prioritize_depth: bool = False, seen=None):
+        self.prioritize_depth = prioritize_depth
+        self._queue = [] if prioritize_depth else deque()
+        self._counter = itertools.count()
+        self.seen = seen if seen is not None else set()
+        for url in urls:
+            self.push(url, 0)
+
+    def _enqueue(self, url: str, depth: int) -> None:
+        if self.prioritize_depth:
+            heapq.heappush(self._queue, (depth, next(self._counter), url))
+        else:
+            self._queue.append((depth, url))
+
+    def push(self, url: str, depth: int = 0) -> bool:
+        """Queue `url` at `depth`; returns False if it was seen before."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self._enqueue(url, depth)
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        """Return the next `(url, depth)` pair. Raises IndexError when empty."""
+        if self.prioritize_depth:
+            depth, _, url = heapq.heappop(self._queue)
+            return url, depth
+        depth, url = self._queue.popleft()
+        return url, depth
+
+    def peek(self) -> Optional[str]:
+        if not self._queue:
+            return None
+        return self._queue[0][-1]
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.seen
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __bool__(self) -> bool:
+        return bool(self._queue)
+
+    def snapshot(self) -> List[List]:
+        """Queued `[url, depth]` pairs in serving order, for checkpointing."""
+        if self.prioritize_depth:
+            return [[url, depth] for depth, _, url in sorted(self._queue)]
+        return [[url, depth] for depth, url in self._queue]
+
+    @classmethod
+    def restore(cls, queued: Iterable, seen=None, prioritize_depth: bool = False) -> 'CrawlFrontier':
+        """Rebuild a frontier from `snapshot()` output and the container of every URL seen so far."""
+        frontier = cls(prioritize_depth=prioritize_depth, seen=seen)
+        for url, depth in queued:
+            frontier.seen.add(url)
+            frontier._enqueue(url, depth)
+        return frontier
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the frontier, counting each URL string once."""
+        total = sys.getsizeof(self._queue) + url_set_memory(self.seen)
+        total += sum(sys.getsizeof(entry) for entry in self._queue)
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self),
+            "seen": len(self.seen),
+            "memory_bytes": self.memory_usage(),
+        }
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+from host_scheduler import host_of
+from page_store import StoredPage
+
+SKIP_EXTENSION = "binary_extension"
+SKIP_CONTENT_TYPE = "content_type"
+SKIP_TRUNCATED = "truncated"
+SKIP_HTTP_STATUS = "http_status"
+SKIP_ERROR = "error"
+SKIP_CIRCUIT_OPEN = "circuit_open"
+
+DEFAULT_SKIP_EXTENSIONS = (
+    'pdf', 'jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'ico', 'bmp', 'tif', 'tiff',
+    'mp3', 'mp4', 'm4a', 'avi', 'mov', 'wmv', 'flv', 'mkv', 'webm', 'ogg', 'wav',
+    'zip', 'rar', '7z', 'gz', 'tgz', 'bz2', 'xz', 'tar', 'exe', 'msi', 'dmg', 'iso', 'apk',
+    'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'odt', 'epub',
+    'css', 'js', 'woff', 'woff2', 'ttf', 'eot',
+)
+DEFAULT_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    headers: Any
+    body: bytes
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        return StoredPage(self.url, self.body, self.status, self.headers).text
+
+
+class Fetcher:
+    """
+    Streaming page fetcher shared by the crawl and LID stages.
+
+    URLs with an obviously binary extension are skipped without a request
+    (crawlers drop such links before queueing them, see `allowed_url`),
+    200 responses whose Content-Type is not HTML are dropped before the body
+    is read, and bodies are read in chunks up to `max_bytes`; anything longer
+    is cut off there (enough for links and LID). Every skip is counted per
+    reason, once per URL, for the per-language metadata.
+
+    `fetch` uses one requests.Session per thread; `fetch_async` takes the
+    caller's aiohttp session. Both return None for skipped URLs and failed
+    requests; other non-200 responses come back without a body so callers
+    can handle 304s.
+
+    With a `rate` controller (see rate_controller.HostRateController), every
+    response and every timeout or connection error is reported to it, and
+    requests to hosts whose circuit is open are skipped.
+    """
+
+    def __init__(self, max_bytes: int = 5000000, content_types: Iterable[str] = DEFAULT_CONTENT_TYPES,
+                 skip_extensions: Iterable[str] = DEFAULT_SKIP_EXTENSIONS, timeout: float = 10,
+                 chunk_size: int = 65536, rate=None):
+        self.max_bytes = max_bytes
+        self.content_types = tuple(content_type.lower() for content_type in content_types)
+        self.skip_extensions = {extension.lower().lstrip('.') for extension in skip_extensions}
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self.skipped = Counter()
+        self._skipped_urls = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], rate=None) -> 'Fetcher':
+        """Build a fetcher from the `fetcher` config section (defaults apply to missing keys)."""
+        fetcher_config = config.get('fetcher') or {}
+        return cls(
+            max_bytes=fetcher_config.get('max_bytes', 5000000),
+            content_types=fetcher_config.get('content_types') or DEFAULT_CONTENT_TYPES,
+            skip_extensions=fetcher_config.get('skip_extensions') or DEFAULT_SKIP_EXTENSIONS,
+            timeout=config['url_settings']['request_timeout'],
+            rate=rate
+        )
+
+    def _skip(self, url: str, reason: str) -> None:
+        with self._lock:
+            if (url, reason) not in self._skipped_urls:
+                self._skipped_urls.add((url, reason))
+                self.skipped[reason] += 1
+
+    def skip_reason(self, url: str) -> Optional[str]:
+        """SKIP_EXTENSION if the URL path ends in a binary file extension, otherwise None."""
+        extension = os.path.splitext(urlsplit(url).path)[1].lower().lstrip('.')
+        return SKIP_EXTENSION if extension in self.skip_extensions else None
+
+    def allowed_url(self, url: str) -> bool:
+        """False (and counted) for a URL with a binary extension; crawlers check links before queueing them."""
+        if self.skip_reason(url):
+            self._skip(url, SKIP_EXTENSION)
+            return False
+        return True
+
+    def _blocked(self, url: str) -> bool:
+        """Skip URLs with a binary extension and hosts whose circuit is open, counting why."""
+        if not self.allowed_url(url):
+            return True
+        if self.rate is not None and not self.rate.allow(host_of(url)):
+            self._skip(url, SKIP_CIRCUIT_OPEN)
+            return True
+        return False
+
+    def _record(self, url: str, started: float, status: int, headers) -> None:
+        if self.rate is not None:
+            self.rate.record_response(host_of(url), status, time.monotonic() - started, headers.get('Retry-After'))
+
+    def _record_failure(self, url: str) -> None:
+        if self.rate is not None:
+            self.rate.record_failure(host_of(url))
+
+    def _release_probe(self, url: str) -> None:
+        # A probe that ended without a recorded outcome must not keep the circuit shut
+        if self.rate is not None:
+            self.rate.release_probe(host_of(url))
+
+    def _html_content_type(self, headers) -> bool:
+        content_type = headers.get('Content-Type')
+        if not content_type:
+            return True
+        return content_type.split(';')[0].strip().lower() in self.content_types
+
+    def _rejected(self, url: str, status: int, headers) -> bool:
+        """True for a 200 response that is not HTML; counts error statuses on the way."""
+        if status >= 400:
+            self._skip(url, SKIP_HTTP_STATUS)
+        if status == 200 and not self._html_content_type(headers):
+            self._skip(url, SKIP_CONTENT_TYPE)
+            return True
+        return False
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[FetchResult]:
+        """Blocking fetch with requests."""
+        if self._blocked(url):
+            return None
+        started = time.monotonic()
+        try:
+            with self._session().get(url, headers=headers or {}, timeout=self.timeout, stream=True) as response:
+                self._record(url, started, response.status_code, response.headers)
+                if self._rejected(url, response.status_code, response.headers):
+                    return None
+                if response.status_code != 200:
+                    return FetchResult(url, response.status_code, response.headers, b'')
+                body = bytearray()
+                truncated = False
+                for chunk in response.iter_content(self.chunk_size):
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        truncated = True
+                        break
+        except requests.RequestException as e:
+            logging.error(f"Error fetching {url}: {e}")
+            if isinstance(e, (requests.Timeout, requests.ConnectionError)):
+                self._record_failure(url)
+            self._skip(url, SKIP_ERROR)
+            return None
+        finally:
+            self._release_probe(url)
+        if truncated:
+            self._skip(url, SKIP_TRUNCATED)
+        return FetchResult(url, response.status_code, response.headers, bytes(body[:self.max_bytes]), truncated)
+
+    async def fetch_async(self, session, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[FetchResult]:
+        """Same as `fetch` on an aiohttp session."""
+        if self._blocked(url):
+            return None
+        started = time.monotonic()
+        try:
+            async with session.get(url, headers=headers or {},
+                                   timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                self._record(url, started, response.status, response.headers)
+                if self._rejected(url, response.status, response.headers):
+                    return None
+                if response.status != 200:
+                    return FetchResult(url, response.status, response.headers, b'')
+                body = bytearray()
+                truncated = False
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        truncated = True
+                        break
+        except Exception as e:
+            logging.error(f"Error fetching {url}: {e}")
+            if isinstance(e, (asyncio.TimeoutError, aiohttp.ClientConnectionError)):
+                self._record_failure(url)
+            self._skip(url, SKIP_ERROR)
+            return None
+        finally:
+            self._release_probe(url)
+        if truncated:
+            self._skip(url, SKIP_TRUNCATED)
+        return FetchResult(url, response.status, response.headers, bytes(body[:self.max_bytes]), truncated)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.skipped)
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class HostPoliteness:
+    """
+    Per-host concurrency cap and minimum delay between requests.
+
+    One instance can be shared by every crawler and filter running in the
+    process, so languages crawled concurrently still respect the same limits
+    for a host they have in common.
+
+    With a `rate` controller (rate_controller.HostRateController) the delay
+    is the host's current adaptive delay instead of `per_host_delay`, and a
+    host stays unavailable while a Retry-After it sent is pending.
+
+    Coroutines waiting in `wait_for_slot` line up per host; only the head of
+    the line watches the host, sleeping out its delay or until `release`
+    frees a slot, so thousands of waiting links cost no CPU.
+    """
+
+    def __init__(self, max_per_host: int = 2, per_host_delay: float = 0.0, clock=time.monotonic, rate=None):
+        self.max_per_host = max(1, max_per_host)
+        self.per_host_delay = per_host_delay
+        self.clock = clock
+        self.rate = rate
+        self._active: Dict[str, int] = {}
+        self._next_allowed: Dict[str, float] = {}
+        self._lines: Dict[str, asyncio.Lock] = {}  # FIFO of wait_for_slot callers per host
+        self._waiting: Dict[str, int] = {}
+        self._freed: Dict[str, asyncio.Event] = {}  # set by release for the head of a host's line
+
+    def is_ready(self, host: str, now: Optional[float] = None) -> bool:
+        now = self.clock() if now is None else now
+        return (self._active.get(host, 0) < self.max_per_host
+                and self.wait_time(host, now) == 0.0)
+
+    def has_capacity(self, host: str) -> bool:
+        return self._active.get(host, 0) < self.max_per_host
+
+    def wait_time(self, host: str, now: Optional[float] = None) -> float:
+        now = self.clock() if now is None else now
+        wait = max(0.0, self._next_allowed.get(host, 0.0) - now)
+        if self.rate is not None:
+            wait = max(wait, self.rate.blocked_for(host, now))
+        return wait
+
+    def acquire(self, host: str, now: Optional[float] = None) -> None:
+        now = self.clock() if now is None else now
+        self._active[host] = self._active.get(host, 0) + 1
+        delay = self.rate.delay(host) if self.rate is not None else self.per_host_delay
+        self._next_allowed[host] = now + delay
+
+    def release(self, host: str) -> None:
+        active = self._active.get(host, 0) - 1
+        if active > 0:
+            self._active[host] = active
+        else:
+            self._active.pop(host, None)
+        freed = self._freed.pop(host, None)
+        if freed is not None:
+            freed.set()
+
+    async def wait_for_slot(self, url: str) -> str:
+        """Block until `url`'s host may be fetched, acquire it and return the host."""
+        host = host_of(url)
+        line = self._lines.get(host)
+        if line is None:
+            line = self._lines[host] = asyncio.Lock()
+        self._waiting[host] = self._waiting.get(host, 0) + 1
+        try:
+            async with line:
+                while not self.is_ready(host):
+                    if self.has_capacity(host):
+                        await asyncio.sleep(self.wait_time(host))
+                    else:
+                        freed = self._freed.get(host)
+                        if freed is None:
+                            freed = self._freed[host] = asyncio.Event()
+                        await freed.wait()
+                self.acquire(host)
+        finally:
+            self._waiting[host] -= 1
+            if not self._waiting[host]:
+                del self._waiting[host]
+                del self._lines[host]
+        return host
+
+
+class HostScheduler:
+    """
+    Crawl queue that hands out URLs only when their host has a free slot.
+
+    URLs are kept in one FIFO queue per host and hosts are served round-robin,
+    so a single slow or heavily linked site cannot starve the others. A host
+    is ready when it has fewer than `max_per_host` fetches in flight and at
+    least `per_host_delay` seconds have passed since its last dispatch.
+    """
+
+    def __init__(self, max_per_host: int = 2, per_host_delay: float = 0.0,
+                 politeness: Optional[HostPoliteness] = None):
+        self.politeness = politeness or HostPoliteness(max_per_host, per_host_delay)
+        self._queues: Dict[str, deque] = {}
+        self._hosts = deque()  # round-robin order of hosts with pending URLs
+        self._pending = set()
+
+    def add(self, url: str) -> bool:
+        """Queue `url`; returns False if it is already pending."""
+        if url in self._pending:
+            return False
+        host = host_of(url)
+        queue = self._queues.get(host)
+        if queue is None:
+            queue = self._queues[host] = deque()
+            self._hosts.append(host)
+        queue.append(url)
+        self._pending.add(url)
+        return True
+
+    def update(self, urls) -> None:
+        for url in urls:
+            self.add(url)
+
+    def discard(self, url: str) -> None:
+        # Lazy removal: the URL is skipped when it reaches the head of its queue.
+        self._pending.discard(url)
+
+    def next_ready(self) -> Optional[str]:
+        """Pop the next URL whose host may be fetched right now, or None."""
+        now = self.politeness.clock()
+        for _ in range(len(self._hosts)):
+            host = self._hosts[0]
+            self._hosts.rotate(-1)
+            if not self.politeness.is_ready(host, now):
+                continue
+            queue = self._queues[host]
+            while queue:
+                url = queue.popleft()
+                if url in self._pending:
+                    break
+            else:
+                url = None
+            if not queue:
+                del self._queues[host]
+                self._hosts.remove(host)
+            if url is None:
+                continue
+            self._pending.discard(url)
+            self.politeness.acquire(host, now)
+            return url
+        return None
+
+    def release(self, url: str) -> None:
+        """Mark a fetch handed out by `next_ready` as finished."""
+        self.politeness.release(host_of(url))
+
+    def seconds_until_ready(self) -> Optional[float]:
+        """Time until some queued host leaves its delay window; None if nothing is waiting on a delay."""
+        now = self.politeness.clock()
+        waits = [
+            self.politeness.wait_time(host, now)
+            for host in self._hosts
+            if self.politeness.has_capacity(host)
+        ]
+        if not waits:
+            return None
+        return min(waits)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    def __iter__(self):
+        return iter(list(self._pending))
@@ -0,0 +1,100 @@
+import logging
+from collections import Counter
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+
+class SessionFactory:
+    """
+    One long-lived aiohttp session for the async pipeline, shared by the
+    crawl and filter stages of every language so pooled connections and
+    cached DNS lookups carry over between them.
+
+    The connector caps connections in total (`limit`) and per host
+    (`limit_per_host`, 0 for no cap), caches DNS results for `dns_ttl`
+    seconds and keeps idle connections open for `keepalive_timeout` seconds.
+    With `compression`, responses are requested gzip/deflate (and brotli when
+    the brotli package is installed) and decompressed transparently;
+    without it, `Accept-Encoding: identity` is sent.
+
+    Connection and DNS activity is counted through aiohttp tracing; see
+    `stats`.
+    """
+
+    def __init__(self, limit: int = 200, limit_per_host: int = 0, dns_ttl: int = 300,
+                 keepalive_timeout: float = 30, compression: bool = True, timeout: float = 10):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.compression = compression
+        self.timeout = timeout
+        self.counts = Counter()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'SessionFactory':
+        """Build the factory from the `http_session` config section (defaults apply to missing keys)."""
+        session_config = config.get('http_session') or {}
+        return cls(
+            limit=session_config.get('limit', 200),
+            limit_per_host=session_config.get('limit_per_host', 0),
+            dns_ttl=session_config.get('dns_ttl', 300),
+            keepalive_timeout=session_config.get('keepalive_timeout', 30),
+            compression=session_config.get('compression', True),
+            timeout=config['url_settings']['request_timeout']
+        )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        def counter(name):
+            async def count(session, context, params):
+                self.counts[name] += 1
+            return count
+
+        trace.on_request_start.append(counter('requests'))
+        trace.on_connection_create_end.append(counter('new_connections'))
+        trace.on_connection_reuseconn.append(counter('reused_connections'))
+        trace.on_connection_queued_start.append(counter('queued_for_connection'))
+        trace.on_dns_cache_hit.append(counter('dns_cache_hits'))
+        trace.on_dns_cache_miss.append(counter('dns_cache_misses'))
+        return trace
+
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use inside the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=None if self.compression else {'Accept-Encoding': 'identity'},
+                trace_configs=[self._trace_config()]
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        logging.info(self.stats_report())
+
+    def stats(self) -> Dict[str, Any]:
+        connections = self.counts['new_connections'] + self.counts['reused_connections']
+        stats = dict(self.counts)
+        stats['connection_reuse_rate'] = round(self.counts['reused_connections'] / connections, 4) if connections else 0.0
+        return stats
+
+    def stats_report(self) -> str:
+        stats = self.stats()
+        return (f"HTTP session: {stats.get('requests', 0)} requests, "
+                f"{stats.get('new_connections', 0)} new / {stats.get('reused_connections', 0)} reused connections "
+                f"({stats['connection_reuse_rate'] * 100:.1f}% reuse), "
+                f"{stats.get('queued_for_connection', 0)} waits for a free connection, "
+                f"DNS cache {stats.get('dns_cache_hits', 0)} hits / {stats.get('dns_cache_misses', 0)} misses")
@@ -1,16 +1,19 @@
 import os
-import re
 import json
 import fasttext
 from trafilatura import extract, fetch_url
 import urllib3
 from tqdm import tqdm
 import yaml
+from page_store import PageStore
+from lid_labels import LabelTable
 
 class LanguageFilter:
     def __init__(self, config_file):
         self.load_config(config_file)
         self.model = self.load_model()
+        self.labels = LabelTable.from_model(self.model)
+        self.page_store = PageStore.from_config(self.config)
     
     def load_config(self, config_file):
         with open(config_file, 'r') as file:
@@ -29,16 +32,12 @@ class LanguageFilter:
         
         return json_data
 
-    def extract_language_code(self, input_str):
-        pattern = r'__(label)__([a-zA-Z]+_[a-zA-Z]+)'
-        match = re.search(pattern, input_str)
-        if match:
-            return match.group(2)
-        else:
-            return None
-
     def trafilatura_scrape(self, url):
-        document = fetch_url(url)
+        document = self.page_store.get_html(url) if self.page_store is not None else None
+        if document is None:
+            document = fetch_url(url)
+            if document is not None and self.page_store is not None:
+                self.page_store.put(url, document)
         text = extract(document)
         return text
 
@@ -54,7 +53,7 @@ class LanguageFilter:
                 
                 if scraped_text is not None:
                     lid_label_script = self.model.predict(scraped_text.replace('\n', ''))
-                    lid_label = self.extract_language_code(lid_label_script[0][0])
+                    lid_label = self.labels.code(lid_label_script[0][0])
                     lid_confidence = lid_label_script[1][0]
                     item['predicted_lid'] = lid_label
                     item['lid_confidence'] = lid_confidence
@@ -0,0 +1,102 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+
+class BatchingPredictor:
+    """
+    Micro-batches fastText predictions coming from many threads or coroutines.
+
+    Callers submit one text at a time and get a Future back. A single worker
+    thread collects pending texts and runs `model.predict(texts, k)` once per
+    batch, flushing when `batch_size` texts are waiting or `max_latency`
+    seconds after the first text of the batch arrived, whichever comes first.
+    Each Future resolves to `(labels, probabilities)` for its own text, the
+    same shape `model.predict(text, k)` returns for a single string.
+    """
+
+    def __init__(self, model, batch_size: int = 64, max_latency: float = 0.01, k: int = 1):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_latency = max_latency
+        self.k = k
+        self.batches = 0
+        self.texts = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="lid-batcher", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_config(cls, model, config: Dict[str, Any]) -> Optional['BatchingPredictor']:
+        """Build a batcher from `language_detector.batching`, or None if batching is disabled."""
+        batching = config['language_detector'].get('batching') or {}
+        if not batching.get('enabled', False):
+            return None
+        return cls(
+            model,
+            batch_size=batching.get('batch_size', 64),
+            max_latency=batching.get('max_latency_ms', 10) / 1000
+        )
+
+    def submit(self, text: str) -> Future:
+        if self._closed:
+            raise RuntimeError("BatchingPredictor is closed")
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text: str):
+        """Blocking single-text prediction through the batcher."""
+        return self.submit(text).result()
+
+    def _collect(self):
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                # Flush what we have, then let the next _collect see the sentinel
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            texts = [text for text, _ in batch]
+            try:
+                labels, probabilities = self.model.predict(texts, k=self.k)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(batch)
+            for (_, future), item_labels, item_probabilities in zip(batch, labels, probabilities):
+                future.set_result((item_labels, item_probabilities))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+        if self.batches:
+            logging.info(f"LID batcher: {self.texts} texts in {self.batches} batches "
+                         f"(mean batch size {self.texts / self.batches:.1f})")
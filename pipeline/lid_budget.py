@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional
+
+FULL_TEXT = "full"
+
+
+class PrefixBudget:
+    """
+    Classify long documents on a bounded amount of text first.
+
+    `budgets` are increasing character counts. The text is classified on the
+    first budget's worth of text, and only moves on to the next budget (and
+    finally the whole document) while the top confidence lies within
+    `margin` of `minimum_confidence`, i.e. where the accept/reject decision
+    could still flip. The budget that settled the decision is returned along
+    with the prediction: a character count, or "full".
+
+    With `sampling: paragraphs` each budget is filled with paragraphs taken
+    evenly across the document instead of its leading characters, which
+    helps pages that open with navigation or boilerplate.
+    """
+
+    def __init__(self, budgets: List[int], minimum_confidence: float, margin: float = 0.1,
+                 sampling: str = 'prefix'):
+        if sampling not in ('prefix', 'paragraphs'):
+            raise ValueError(f"Unknown sampling mode: {sampling}")
+        self.budgets = sorted(budgets)
+        self.minimum_confidence = minimum_confidence
+        self.margin = margin
+        self.sampling = sampling
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['PrefixBudget']:
+        """Build the budget from `language_detector.prefix_budget`, or None if it is disabled."""
+        detector_config = config['language_detector']
+        budget_config = detector_config.get('prefix_budget') or {}
+        if not budget_config.get('enabled', False):
+            return None
+        return cls(
+            budget_config.get('budgets', [2000, 8000]),
+            detector_config['minimum_confidence'],
+            margin=budget_config.get('margin', 0.1),
+            sampling=budget_config.get('sampling', 'prefix')
+        )
+
+    def sample(self, text: str, budget: int) -> str:
+        """At most about `budget` characters of `text`, newlines removed like the full-text path."""
+        if self.sampling == 'prefix':
+            flat = text.replace('\n', '')
+            if len(flat) <= budget:
+                return flat
+            cut = flat.rfind(' ', 0, budget)
+            return flat[:cut if cut > budget // 2 else budget]
+
+        paragraphs = [paragraph for paragraph in text.split('\n') if paragraph.strip()]
+        chosen = []
+        used = 0
+        # Visit paragraphs by halving the stride so the sample spreads over the whole page
+        order = []
+        seen = set()
+        stride = len(paragraphs)
+        while stride >= 1 and len(order) < len(paragraphs):
+            for i in range(0, len(paragraphs), stride):
+                if i not in seen:
+                    seen.add(i)
+                    order.append(i)
+            stride //= 2
+        for i in order:
+            if used + len(paragraphs[i]) > budget and chosen:
+                break
+            chosen.append(i)
+            used += len(paragraphs[i])
+        return ''.join(paragraphs[i] for i in sorted(chosen))[:budget]
+
+    def _steps(self, text: str):
+        length = len(text)
+        for budget in self.budgets:
+            if budget >= length:
+                break
+            yield budget, self.sample(text, budget)
+        yield FULL_TEXT, text.replace('\n', '')
+
+    def _settled(self, confidence: float) -> bool:
+        return abs(confidence - self.minimum_confidence) >= self.margin
+
+    def predict(self, predict, text: str):
+        """`(labels, probabilities, budget)` using `predict(text)` on growing amounts of text."""
+        for budget, sample in self._steps(text):
+            labels, probabilities = predict(sample)
+            if budget == FULL_TEXT or self._settled(float(probabilities[0])):
+                return labels, probabilities, budget
+
+    async def predict_async(self, predict, text: str):
+        """Same as `predict` for a coroutine `predict(text)`."""
+        for budget, sample in self._steps(text):
+            labels, probabilities = await predict(sample)
+            if budget == FULL_TEXT or self._settled(float(probabilities[0])):
+                return labels, probabilities, budget
@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Dict, Optional, Tuple
+
+from lid_model import active_model_path
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def model_fingerprint(model_path: str) -> str:
+    """Identifies a model file, so a replaced or retrained model at the same path counts as a new model."""
+    stat = os.stat(model_path)
+    return f"{os.path.abspath(model_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def text_key(text: str) -> str:
+    normalized = _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+    return hashlib.blake2b(normalized.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+class LIDCache:
+    """
+    LID results keyed by a hash of the normalized extracted text.
+
+    Boilerplate and mirrored pages produce the same text under many URLs and
+    across reruns; a hit returns the stored `(raw_label, confidence)`
+    without running the model. Recent results are kept in an in-memory LRU
+    of `memory_entries` items in front of a SQLite table. Entries belong to
+    one model version (see `model_fingerprint`); rows written by any other
+    version are dropped when the cache is opened.
+
+    Connections are opened lazily, per thread and per process, so the cache
+    can be created before forking LID worker processes and shared with them.
+    Nothing stays open from the constructor.
+    """
+
+    def __init__(self, path: str, model_version: str, memory_entries: int = 100000):
+        self.path = path
+        self.model_version = model_version
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    text_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    label TEXT,
+                    confidence REAL,
+                    PRIMARY KEY (text_hash, model)
+                )
+            """)
+            stale = conn.execute("DELETE FROM results WHERE model != ?", (model_version,)).rowcount
+        if stale:
+            logging.info(f"LID cache: dropped {stale} results from other model versions")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], prefix_budget=None) -> Optional['LIDCache']:
+        """Build the cache from the `lid_cache` config section, or None if it is disabled."""
+        cache_config = config.get('lid_cache') or {}
+        if not cache_config.get('enabled', False):
+            return None
+        model_version = model_fingerprint(active_model_path(config))
+        if prefix_budget is not None:
+            # Budgeted decisions may differ from full-text ones, so they are cached separately
+            model_version += (f"|budget={prefix_budget.budgets}:{prefix_budget.minimum_confidence}:"
+                              f"{prefix_budget.margin}:{prefix_budget.sampling}")
+        return cls(cache_config['path'], model_version, cache_config.get('memory_entries', 100000))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _remember(self, key: str, value: Tuple[Optional[str], Optional[float]]) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, text: str) -> Optional[Tuple[Optional[str], Optional[float]]]:
+        """Stored `(raw_label, confidence)` for `text`, or None on a miss."""
+        key = text_key(text)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+        row = self._connection().execute(
+            "SELECT label, confidence FROM results WHERE text_hash = ? AND model = ?",
+            (key, self.model_version)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, (row[0], row[1]))
+        return row[0], row[1]
+
+    def put(self, text: str, label: Optional[str], confidence: Optional[float]) -> None:
+        key = text_key(text)
+        self._remember(key, (label, confidence))
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (text_hash, model, label, confidence) VALUES (?, ?, ?, ?)",
+                (key, self.model_version, label, confidence)
+            )
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        return f"LID cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
@@ -0,0 +1,94 @@
+import http.client
+import json
+import os
+import socket
+import threading
+from typing import Any, Dict
+
+import numpy as np
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class LIDClient:
+    """
+    Client for pipeline/lid_server.py with the parts of the fastText model
+    interface the pipeline uses: `predict(text_or_texts, k)` and
+    `get_labels()`. It can be passed anywhere a loaded model is expected,
+    e.g. as the `model` of LanguageDetector.
+
+    Connections are kept alive, one per thread and process.
+    """
+
+    def __init__(self, socket_path: str = None, host: str = '127.0.0.1', port: int = 8765, timeout: float = 60):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._local = threading.local()
+        self._labels = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'LIDClient':
+        server_config = config.get('lid_server') or {}
+        return cls(
+            socket_path=server_config.get('socket') or None,
+            host=server_config.get('host', '127.0.0.1'),
+            port=server_config.get('port', 8765),
+            timeout=server_config.get('timeout', 60)
+        )
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            if self.socket_path:
+                conn = _UnixHTTPConnection(self.socket_path, self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _request(self, method: str, path: str, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = json.loads(response.read())
+            except (http.client.HTTPException, ConnectionError):
+                # Server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise ValueError(data.get('error', f"LID server returned {response.status}"))
+            return data
+
+    def predict(self, text, k: int = 1):
+        """Same return shape as fastText: one `(labels, probabilities)` pair, or lists of them for a list input."""
+        single = isinstance(text, str)
+        data = self._request('POST', '/predict', {"texts": [text] if single else list(text), "k": k})
+        labels = [tuple(item_labels) for item_labels in data['labels']]
+        probabilities = [np.array(item_probabilities) for item_probabilities in data['probabilities']]
+        if single:
+            return labels[0], probabilities[0]
+        return labels, probabilities
+
+    def get_labels(self):
+        if self._labels is None:
+            self._labels = self._request('GET', '/labels')['labels']
+        return self._labels
@@ -0,0 +1,64 @@
+import re
+import weakref
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+_LABEL_PATTERN = re.compile(r'__(label)__([a-zA-Z]+_[a-zA-Z]+)')
+
+# Weak keys: a cached table must not keep its model loaded
+_tables = weakref.WeakKeyDictionary()
+
+
+def extract_language_code(input_str: str) -> Optional[str]:
+    """Language code (e.g. "bpy_Beng") of a raw fastText label such as "__label__bpy_Beng"."""
+    match = _LABEL_PATTERN.search(input_str)
+    return match.group(2) if match else None
+
+
+class LabelTable:
+    """
+    Raw fastText labels mapped to language codes once, from `model.get_labels()`.
+
+    `code` is a dict lookup instead of a regex per prediction. `topk` turns the
+    output of a batched `model.predict(texts, k)` into two `(n, k)` arrays,
+    codes and probabilities, so thresholds can be checked on whole batches.
+    """
+
+    def __init__(self, labels: Iterable[str]):
+        self.codes = {label: extract_language_code(label) for label in labels}
+
+    @classmethod
+    def from_model(cls, model) -> 'LabelTable':
+        """Table for `model`, built on first use and shared afterwards."""
+        try:
+            table = _tables.get(model)
+        except TypeError:  # not weakly referenceable: build a table each time
+            return cls(model.get_labels())
+        if table is None:
+            table = _tables[model] = cls(model.get_labels())
+        return table
+
+    def code(self, raw_label: Optional[str]) -> Optional[str]:
+        if raw_label is None:
+            return None
+        code = self.codes.get(raw_label)
+        if code is None and raw_label not in self.codes:
+            # Labels from another model version, e.g. stored in a cache
+            code = extract_language_code(raw_label)
+        return code
+
+    def topk(self, labels: Sequence[Sequence[str]], probabilities) -> Tuple[np.ndarray, np.ndarray]:
+        """`(codes, probabilities)` arrays of shape `(n, k)` for batched fastText output."""
+        codes = np.array([[self.code(label) for label in row] for row in labels], dtype=object)
+        return codes, np.asarray(probabilities, dtype=np.float32).reshape(codes.shape)
+
+    def predict_topk(self, model, texts: Sequence[str], k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k codes and probabilities for a batch of texts, newlines removed as in single predictions."""
+        labels, probabilities = model.predict([text.replace('\n', '') for text in texts], k=k)
+        return self.topk(labels, probabilities)
+
+
+def accepted(codes: np.ndarray, probabilities: np.ndarray, target_label: str, minimum_confidence: float) -> np.ndarray:
+    """Boolean mask of rows whose top prediction is `target_label` with at least `minimum_confidence`."""
+    return (codes[:, 0] == target_label) & (probabilities[:, 0] >= minimum_confidence)
@@ -0,0 +1,53 @@
+"""
+Locating and loading the LID model.
+
+Kept apart from lid_client so modules that only need the model path, like
+the LID cache, do not import fastText and numpy; they are imported only when
+a model or client is actually loaded.
+"""
+import logging
+import os
+import resource
+import time
+from typing import Any, Dict
+
+
+def active_model_path(config: Dict[str, Any]) -> str:
+    """`quantized_model_path` when `use_quantized` is set, otherwise `model_path`."""
+    detector_config = config['language_detector']
+    if detector_config.get('use_quantized', False):
+        return detector_config['quantized_model_path']
+    return detector_config['model_path']
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_fasttext_model(path: str):
+    """`fasttext.load_model`, logging the file size and the resident memory the model added."""
+    import fasttext
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    model = fasttext.load_model(path)
+    logging.info(f"Loaded LID model {path}: {os.path.getsize(path) / 1e6:.1f} MB on disk, "
+                 f"+{rss_mb() - rss_before:.1f} MB resident, {time.perf_counter() - start:.1f} s")
+    return model
+
+
+def load_model(config: Dict[str, Any]):
+    """The configured fastText model (see `active_model_path`), or a client for the LID server if it is enabled."""
+    if (config.get('lid_server') or {}).get('enabled', False):
+        from lid_client import LIDClient
+
+        return LIDClient.from_config(config)
+    return load_fasttext_model(active_model_path(config))
@@ -0,0 +1,110 @@
+"""
+Local LID server: loads the fastText model once and serves predictions to
+every crawler process on the host.
+
+Predictions from all connected clients go through one BatchingPredictor, so
+concurrent requests are batched on the server side. Listens on a Unix socket
+(`lid_server.socket`) or, if that is empty, on `lid_server.host`/`port`.
+
+Usage (from the repository root):
+    python pipeline/lid_server.py --config pipeline/config.yaml
+
+Endpoints:
+    POST /predict  {"texts": [...], "k": 1} -> {"labels": [[...]], "probabilities": [[...]]}
+    GET  /labels   -> {"labels": [...]}
+    GET  /health   -> {"status": "ok", "model": ..., "texts": ..., "batches": ...}
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+
+import yaml
+from aiohttp import web
+
+from lid_batcher import BatchingPredictor
+from lid_model import active_model_path, load_fasttext_model
+
+
+def create_app(model, model_path: str, batch_size: int = 64, max_latency: float = 0.01) -> web.Application:
+    batcher = BatchingPredictor(model, batch_size=batch_size, max_latency=max_latency)
+    labels = model.get_labels()
+
+    async def predict(request: web.Request) -> web.Response:
+        try:
+            payload = await request.json()
+            texts = payload['texts']
+            k = int(payload.get('k', 1))
+        except (ValueError, KeyError, TypeError) as e:
+            return web.json_response({"error": f"Bad request: {e}"}, status=400)
+        # Checked up front: one bad text would otherwise fail the whole shared batch
+        if any(not isinstance(text, str) or '\n' in text for text in texts):
+            return web.json_response({"error": "texts must be strings without newlines"}, status=400)
+        try:
+            if k == batcher.k:
+                results = await asyncio.gather(*(asyncio.wrap_future(batcher.submit(text)) for text in texts))
+            else:
+                loop = asyncio.get_running_loop()
+                batch_labels, batch_probabilities = await loop.run_in_executor(None, model.predict, texts, k)
+                results = list(zip(batch_labels, batch_probabilities))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response({
+            "labels": [list(item_labels) for item_labels, _ in results],
+            "probabilities": [[float(p) for p in item_probabilities] for _, item_probabilities in results],
+        })
+
+    async def get_labels(request: web.Request) -> web.Response:
+        return web.json_response({"labels": labels})
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok", "model": model_path, "texts": batcher.texts, "batches": batcher.batches
+        })
+
+    async def close_batcher(app: web.Application) -> None:
+        batcher.close()
+
+    app = web.Application(client_max_size=64 * 1024 ** 2)
+    app.router.add_post('/predict', predict)
+    app.router.add_get('/labels', get_labels)
+    app.router.add_get('/health', health)
+    app.on_cleanup.append(close_batcher)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local LID server")
+    parser.add_argument("--config", default="pipeline/config.yaml", help="Pipeline config file")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as file:
+        config = yaml.safe_load(file)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    model_path = active_model_path(config)
+    server_config = config.get('lid_server') or {}
+    batching = config['language_detector'].get('batching') or {}
+    app = create_app(
+        load_fasttext_model(model_path), model_path,
+        batch_size=batching.get('batch_size', 64),
+        max_latency=batching.get('max_latency_ms', 10) / 1000
+    )
+
+    socket_path = server_config.get('socket')
+    if socket_path:
+        if os.path.dirname(socket_path):
+            os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        logging.info(f"Serving {model_path} on unix:{socket_path}")
+        web.run_app(app, path=socket_path, print=None, access_log=None)
+    else:
+        host, port = server_config.get('host', '127.0.0.1'), server_config.get('port', 8765)
+        logging.info(f"Serving {model_path} on http://{host}:{port}")
+        web.run_app(app, host=host, port=port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future
+from typing import Any, Dict, FrozenSet, Optional
+
+from trafilatura import extract
+
+from lid_budget import PrefixBudget
+from script_prefilter import ScriptPrefilter
+from template_filter import strip_template
+from text_extractor import TIER_FULL, TieredExtractor
+
+# Set in the parent before the pool forks; workers inherit them copy-on-write
+_model = None
+_cache = None
+
+
+def _predict(text, k: int = 1):
+    return _model.predict(text, k=k)
+
+
+def _classify_html(html, k: int, return_text: bool, prefix_budget: Optional[PrefixBudget],
+                   script_filter: Optional[ScriptPrefilter], extractor: Optional[TieredExtractor],
+                   template: Optional[FrozenSet[bytes]]):
+    page = strip_template(html, template)
+    if extractor is not None:
+        text, tier = extractor.lid_text(page)
+        full_text = text if tier == TIER_FULL else None
+    else:
+        text = full_text = extract(page) if html else None
+    if text is None:
+        return None, None, None, None
+    returned_text = full_text if return_text else None
+    if script_filter is not None:
+        settled = script_filter.check(text)
+        if settled is not None:
+            return (returned_text, *settled)
+    if _cache is not None:
+        cached = _cache.get(text)
+        if cached is not None:
+            return returned_text, cached[0], cached[1], None
+    if prefix_budget is not None:
+        labels, probabilities, budget = prefix_budget.predict(lambda sample: _predict(sample, k), text)
+    else:
+        labels, probabilities = _predict(text.replace('\n', ''), k)
+        budget = None
+    if _cache is not None:
+        _cache.put(text, labels[0], float(probabilities[0]))
+    return returned_text, labels[0], float(probabilities[0]), budget
+
+
+class LIDWorkerPool:
+    """
+    Process pool for the CPU-bound part of filtering: trafilatura extraction
+    and fastText prediction.
+
+    The worker processes are forked once, right after the model is loaded, so
+    they share the parent's model pages copy-on-write instead of each loading
+    their own copy. Fetching stays in the caller's threads; they hand the raw
+    HTML to `submit` and get a Future resolving to
+    `(text, raw_label, confidence, budget)`, with `text` only filled in when
+    `return_text` is set and the page went through trafilatura (not when the
+    fast tier of `extractor` settled it), and `budget` only when a prefix
+    budget or the script prefilter settled the decision.
+    A `lid_cache` given here is consulted inside the workers. Pages submitted
+    with a `template` (from the caller's TemplateFilter.template) have those
+    blocks removed first; templates are learned only in the caller.
+    """
+
+    def __init__(self, model, processes: Optional[int] = None, k: int = 1, return_text: bool = False,
+                 prefix_budget: Optional[PrefixBudget] = None, lid_cache=None,
+                 extractor: Optional[TieredExtractor] = None):
+        global _model, _cache
+        _model = model
+        _cache = lid_cache
+        self.processes = processes or os.cpu_count() or 1
+        self.k = k
+        self.return_text = return_text
+        self.prefix_budget = prefix_budget
+        self.extractor = extractor
+        # Pool forks all workers up front, before any crawler threads are started
+        self._pool = multiprocessing.get_context('fork').Pool(self.processes)
+        logging.info(f"Started {self.processes} LID worker processes")
+
+    @classmethod
+    def from_config(cls, model, config: Dict[str, Any], lid_cache=None) -> Optional['LIDWorkerPool']:
+        """Build the pool from `language_detector.cpu_workers`, or None if it is disabled."""
+        workers = config['language_detector'].get('cpu_workers') or {}
+        if not workers.get('enabled', False):
+            return None
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logging.warning("LID worker processes need the 'fork' start method; running LID in threads")
+            return None
+        return cls(
+            model,
+            processes=workers.get('processes') or None,
+            return_text=config['language_detector'].get('save_text', False),
+            prefix_budget=PrefixBudget.from_config(config),
+            lid_cache=lid_cache,
+            extractor=TieredExtractor.from_config(config)
+        )
+
+    def submit(self, html, script_filter: Optional[ScriptPrefilter] = None,
+               template: Optional[FrozenSet[bytes]] = None) -> Future:
+        future = Future()
+        self._pool.apply_async(
+            _classify_html,
+            (html, self.k, self.return_text, self.prefix_budget, script_filter, self.extractor, template),
+            callback=future.set_result, error_callback=future.set_exception
+        )
+        return future
+
+    def classify(self, html, script_filter: Optional[ScriptPrefilter] = None,
+                 template: Optional[FrozenSet[bytes]] = None):
+        """Blocking `(text, raw_label, confidence, budget)` for one page."""
+        return self.submit(html, script_filter, template).result()
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
@@ -0,0 +1,57 @@
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+from lxml import etree
+
+
+class _LinkTarget:
+    """lxml parser target that only records <a href> and the first <base href>."""
+
+    def __init__(self):
+        self.hrefs = []
+        self.base = None
+
+    def start(self, tag, attrib):
+        if tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.hrefs.append(href)
+        elif tag == 'base' and self.base is None:
+            self.base = attrib.get('href')
+
+    def end(self, tag):
+        pass
+
+    def close(self) -> Tuple[List[str], Optional[str]]:
+        return self.hrefs, self.base
+
+
+def extract_hrefs(html) -> Tuple[List[str], Optional[str]]:
+    """
+    Raw href values of all anchors plus the document's <base href>, if any.
+
+    The page is streamed through lxml's event interface, so no element tree
+    is built. Malformed markup is recovered from the same way as lxml.html.
+    """
+    if not html:
+        return [], None
+    target = _LinkTarget()
+    parser = etree.HTMLParser(target=target, recover=True, no_network=True)
+    try:
+        parser.feed(html)
+        return parser.close()
+    except etree.LxmlError:
+        return target.hrefs, target.base
+
+
+def extract_links(html, page_url: str) -> List[str]:
+    """Absolute URLs of all <a href> on a page, resolved against <base href> when present."""
+    hrefs, base = extract_hrefs(html)
+    base_url = urljoin(page_url, base.strip()) if base else page_url
+    links = []
+    for href in hrefs:
+        try:
+            links.append(urljoin(base_url, href.strip()))
+        except ValueError:  # e.g. malformed IPv6 hosts
+            continue
+    return links
@@ -0,0 +1,205 @@
+import codecs
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from trafilatura.utils import decode_file
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+_BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+# Browsers look for the meta tag in the first 1024 bytes only
+_META_SCAN_BYTES = 1024
+
+
+def normalize_url(url: str) -> str:
+    """Canonical store key: lowercase scheme and host, no default port, no fragment."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+@dataclass
+class StoredPage:
+    url: str
+    body: bytes
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    fetched_at: float = 0.0
+    content_hash: str = ''
+    truncated: bool = False  # body cut off at the fetcher's size cap
+
+    @property
+    def encoding(self) -> Optional[str]:
+        """
+        Declared encoding, in the order browsers apply: byte-order mark, the
+        Content-Type charset, then a `<meta>` charset near the top of the page;
+        None if the page declares none.
+        """
+        for bom, encoding in _BOMS:
+            if self.body.startswith(bom):
+                return encoding
+        content_type = self.headers.get('content-type', '')
+        for param in content_type.split(';')[1:]:
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'charset' and value:
+                return value.strip('"\'')
+        match = _META_CHARSET.search(self.body[:_META_SCAN_BYTES])
+        if match:
+            return match.group(1).decode('ascii')
+        return None
+
+    @property
+    def text(self) -> str:
+        """Decoded body; an undeclared encoding is detected by trafilatura instead of assuming UTF-8."""
+        encoding = self.encoding
+        if encoding is not None:
+            try:
+                return self.body.decode(encoding, errors='replace')
+            except LookupError:
+                pass
+        return decode_file(self.body)
+
+
+class PageStore:
+    """
+    Local store of fetched pages shared by the crawl, LID and cleaning stages.
+
+    An SQLite index maps the normalized URL to response status, headers,
+    fetch time, the SHA-256 of the body and whether the body was truncated. Bodies live under `blobs/` as one
+    compressed file per content hash, so mirrored pages are stored once.
+    """
+
+    def __init__(self, directory: str, compression: str = 'zstd'):
+        self.directory = directory
+        self.blob_directory = os.path.join(directory, 'blobs')
+        os.makedirs(self.blob_directory, exist_ok=True)
+        if compression == 'zstd' and zstandard is None:
+            compression = 'gzip'
+        self.compression = compression
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    truncated INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+            if 'truncated' not in columns:
+                # Stores created before the flag existed
+                conn.execute("ALTER TABLE pages ADD COLUMN truncated INTEGER NOT NULL DEFAULT 0")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['PageStore']:
+        """Build the store from the `page_store` config section, or None if it is disabled."""
+        store_config = config.get('page_store') or {}
+        if not store_config.get('enabled', False):
+            return None
+        return cls(store_config['directory'], store_config.get('compression', 'zstd'))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _blob_path(self, content_hash: str, extension: str) -> str:
+        return os.path.join(self.blob_directory, content_hash[:2], f"{content_hash}{extension}")
+
+    def _write_blob(self, content_hash: str, body: bytes) -> None:
+        for extension in ('.zst', '.gz'):
+            if os.path.exists(self._blob_path(content_hash, extension)):
+                return
+        if self.compression == 'zstd':
+            path, data = self._blob_path(content_hash, '.zst'), zstandard.ZstdCompressor().compress(body)
+        else:
+            path, data = self._blob_path(content_hash, '.gz'), gzip.compress(body)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    def _read_blob(self, content_hash: str) -> Optional[bytes]:
+        path = self._blob_path(content_hash, '.zst')
+        if os.path.exists(path):
+            if zstandard is None:
+                raise RuntimeError(f"{path} is zstd-compressed but the zstandard package is not installed")
+            with open(path, 'rb') as file:
+                return zstandard.ZstdDecompressor().decompress(file.read())
+        path = self._blob_path(content_hash, '.gz')
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                return gzip.decompress(file.read())
+        return None
+
+    def put(self, url: str, body, headers: Optional[Dict[str, str]] = None,
+            status: int = 200, fetched_at: Optional[float] = None, truncated: bool = False) -> str:
+        """Store a response body (bytes or str) and its metadata; returns the content hash."""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+            headers = dict(headers or {})
+            headers['content-type'] = 'text/html; charset=utf-8'
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        content_hash = hashlib.sha256(body).hexdigest()
+        self._write_blob(content_hash, body)
+        with self._write_lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, status, headers, fetched_at, truncated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), content_hash, status, json.dumps(headers),
+                 fetched_at if fetched_at is not None else time.time(), int(truncated))
+            )
+        return content_hash
+
+    def get(self, url: str) -> Optional[StoredPage]:
+        key = normalize_url(url)
+        row = self._connection().execute(
+            "SELECT content_hash, status, headers, fetched_at, truncated FROM pages WHERE url = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        body = self._read_blob(row[0])
+        if body is None:
+            return None
+        return StoredPage(key, body, row[1], json.loads(row[2]), row[3], row[0], bool(row[4]))
+
+    def get_html(self, url: str) -> Optional[str]:
+        """Decoded body of a stored successful response, or None."""
+        page = self.get(url)
+        if page is None or page.status >= 400:
+            return None
+        return page.text
+
+    def __contains__(self, url: str) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM pages WHERE url = ?", (normalize_url(url),)
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
@@ -0,0 +1,181 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+# Statuses that ask the client to slow down
+BACKOFF_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value: Optional[str], now_epoch: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now_epoch is None else now_epoch))
+
+
+class _HostRate:
+    __slots__ = ('delay', 'next_request', 'retry_at', 'failures', 'open_until', 'probing')
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.next_request = 0.0  # earliest start of the next request (last completion + delay)
+        self.retry_at = 0.0  # Retry-After deadline
+        self.failures = 0  # consecutive timeouts / connection errors
+        self.open_until = None  # circuit breaker open until this time
+        self.probing = False  # half-open: one request let through
+
+
+class HostRateController:
+    """
+    AIMD pacing per host, plus a circuit breaker for hosts that stop answering.
+
+    Every host starts at `initial_delay` seconds between requests. A response
+    that arrives within `latency_target` seconds takes `decrease_step` off the
+    delay, down to `min_delay` (additive rate increase). A slow response, a
+    429/503 or a timeout multiplies it by `backoff_factor`, up to `max_delay`
+    (multiplicative decrease). A Retry-After header blocks the host until the
+    given time, capped at `max_retry_after`.
+
+    After `failure_threshold` consecutive timeouts or connection errors the
+    host's circuit opens: `allow` refuses it for `open_seconds`, then lets one
+    probe through. A response closes the circuit again, another failure
+    reopens it; any other outcome releases the probe so a later request may
+    try again.
+
+    Outcomes are reported by the Fetcher; HostPoliteness (async stages and
+    the threaded filter) takes `delay` and `blocked_for` from here, and the
+    threaded crawler sets aside URLs of hosts whose `wait_time` has not passed
+    yet. Safe to share between threads.
+    """
+
+    def __init__(self, initial_delay: float = 0.5, min_delay: float = 0.0, max_delay: float = 30.0,
+                 decrease_step: float = 0.05, backoff_factor: float = 2.0, latency_target: float = 2.0,
+                 failure_threshold: int = 3, open_seconds: float = 300, max_retry_after: float = 600,
+                 clock=time.monotonic):
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.decrease_step = decrease_step
+        self.backoff_factor = backoff_factor
+        self.latency_target = latency_target
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_retry_after = max_retry_after
+        self.clock = clock
+        self.backoffs = 0
+        self.circuits_opened = 0
+        self._hosts: Dict[str, _HostRate] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['HostRateController']:
+        """Build the controller from the `rate_control` config section, or None if it is disabled."""
+        rate_config = config.get('rate_control') or {}
+        if not rate_config.get('enabled', False):
+            return None
+        return cls(
+            initial_delay=rate_config.get('initial_delay', 0.5),
+            min_delay=rate_config.get('min_delay', 0.0),
+            max_delay=rate_config.get('max_delay', 30.0),
+            decrease_step=rate_config.get('decrease_step', 0.05),
+            backoff_factor=rate_config.get('backoff_factor', 2.0),
+            latency_target=rate_config.get('latency_target', 2.0),
+            failure_threshold=rate_config.get('failure_threshold', 3),
+            open_seconds=rate_config.get('open_seconds', 300),
+            max_retry_after=rate_config.get('max_retry_after', 600)
+        )
+
+    def _state(self, host: str) -> _HostRate:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostRate(self.initial_delay)
+        return state
+
+    def _back_off(self, state: _HostRate) -> None:
+        state.delay = min(self.max_delay, max(state.delay, self.decrease_step) * self.backoff_factor)
+        self.backoffs += 1
+
+    def delay(self, host: str) -> float:
+        with self._lock:
+            return self._state(host).delay
+
+    def blocked_for(self, host: str, now: Optional[float] = None) -> float:
+        """Seconds until a Retry-After for `host` has passed."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            return max(0.0, self._state(host).retry_at - now)
+
+    def wait_time(self, host: str, now: Optional[float] = None) -> float:
+        """Seconds a sequential crawler should wait before its next request to `host`."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self._state(host)
+            return max(0.0, state.retry_at - now, state.next_request - now)
+
+    def allow(self, host: str, now: Optional[float] = None) -> bool:
+        """False while `host`'s circuit is open; once it expires, True for a single probe request."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self._state(host)
+            if state.open_until is None:
+                return True
+            if now < state.open_until or state.probing:
+                return False
+            state.probing = True
+            return True
+
+    def release_probe(self, host: str) -> None:
+        """End a probe that produced neither a response nor a failure (cancelled, invalid URL, ...)."""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is not None:
+                state.probing = False
+
+    def record_response(self, host: str, status: int, latency: float, retry_after: Optional[str] = None) -> None:
+        """Feed back a response: `latency` is the time until its headers arrived."""
+        now = self.clock()
+        with self._lock:
+            state = self._state(host)
+            state.failures = 0
+            state.open_until = None
+            state.probing = False
+            if status in BACKOFF_STATUSES or latency > self.latency_target:
+                self._back_off(state)
+            else:
+                state.delay = max(self.min_delay, state.delay - self.decrease_step)
+            wait = parse_retry_after(retry_after) if status in BACKOFF_STATUSES else None
+            if wait is not None:
+                state.retry_at = max(state.retry_at, now + min(wait, self.max_retry_after))
+            state.next_request = now + state.delay
+
+    def record_failure(self, host: str) -> None:
+        """Feed back a timeout or connection error."""
+        now = self.clock()
+        with self._lock:
+            state = self._state(host)
+            state.failures += 1
+            self._back_off(state)
+            state.next_request = now + state.delay
+            if state.probing or state.failures >= self.failure_threshold:
+                if state.open_until is None or state.probing:
+                    self.circuits_opened += 1
+                    logging.warning(f"Opening circuit for {host} for {self.open_seconds} s "
+                                    f"after {state.failures} consecutive failures")
+                state.open_until = now + self.open_seconds
+                state.probing = False
+
+    def stats(self) -> str:
+        with self._lock:
+            open_circuits = sum(1 for state in self._hosts.values() if state.open_until is not None)
+            mean_delay = sum(state.delay for state in self._hosts.values()) / len(self._hosts) if self._hosts else 0.0
+            return (f"Rate control: {len(self._hosts)} hosts, mean delay {mean_delay:.2f} s, "
+                    f"{self.backoffs} backoffs, {self.circuits_opened} circuits opened, {open_circuits} open")
@@ -0,0 +1,112 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from page_store import normalize_url
+
+
+class RevalidationCache:
+    """
+    Per-URL validators and results from earlier runs, for incremental recrawls.
+
+    For every fetched URL the cache keeps the ETag and Last-Modified response
+    headers, the in-scope links found on the page and the last LID result
+    (with the model it came from). On the next run the crawler sends
+    If-None-Match / If-Modified-Since, and a 304 response lets it reuse the
+    stored links and LID decision instead of downloading and classifying the
+    page again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    links TEXT,
+                    lid_label TEXT,
+                    lid_confidence REAL,
+                    lid_model TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['RevalidationCache']:
+        """Build the cache from the `revalidation` config section, or None if it is disabled."""
+        cache_config = config.get('revalidation') or {}
+        if not cache_config.get('enabled', False):
+            return None
+        return cls(cache_config['path'])
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _row(self, url: str, columns: str):
+        return self._connection().execute(
+            f"SELECT {columns} FROM entries WHERE url = ?", (normalize_url(url),)
+        ).fetchone()
+
+    def _upsert(self, url: str, **values) -> None:
+        values['updated_at'] = time.time()
+        columns = ', '.join(values)
+        placeholders = ', '.join('?' for _ in values)
+        updates = ', '.join(f"{column} = excluded.{column}" for column in values)
+        with self._write_lock, self._connection() as conn:
+            conn.execute(
+                f"INSERT INTO entries (url, {columns}) VALUES (?, {placeholders}) "
+                f"ON CONFLICT(url) DO UPDATE SET {updates}",
+                (normalize_url(url), *values.values())
+            )
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for `url`, empty if nothing is known."""
+        row = self._row(url, 'etag, last_modified')
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers['If-None-Match'] = row[0]
+            if row[1]:
+                headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def record_response(self, url: str, headers) -> None:
+        """Remember the validators of a 200 response."""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if etag or last_modified:
+            self._upsert(url, etag=etag, last_modified=last_modified)
+
+    def record_links(self, url: str, links: Set[str]) -> None:
+        self._upsert(url, links=json.dumps(sorted(links)))
+
+    def get_links(self, url: str) -> Optional[Set[str]]:
+        row = self._row(url, 'links')
+        if row is None or row[0] is None:
+            return None
+        return set(json.loads(row[0]))
+
+    def record_lid(self, url: str, lid_label: Optional[str], lid_confidence: Optional[float], model: str) -> None:
+        self._upsert(url, lid_label=lid_label, lid_confidence=lid_confidence, lid_model=model)
+
+    def get_lid(self, url: str, model: str) -> Optional[Tuple[Optional[str], Optional[float]]]:
+        """Stored `(label, confidence)` for `url` if it was produced by `model`."""
+        row = self._row(url, 'lid_label, lid_confidence, lid_model')
+        if row is None or row[2] != model:
+            return None
+        return row[0], row[1]
@@ -0,0 +1,59 @@
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+_END = object()
+
+
+class HostScopeMatcher:
+    """
+    Decides whether a host belongs to one of the seed sites.
+
+    Seed hosts are stored in a trie keyed by reversed DNS labels
+    ("www.example.org" -> org -> example -> www), built once per crawler.
+    A host is in scope when the seed host is a label-wise suffix of it, so
+    "blog.example.org" matches the seed "example.org" but "badexample.org"
+    does not. A lookup walks at most one trie node per label of the host,
+    independent of the number of seeds.
+    """
+
+    def __init__(self, seed_urls: Iterable[str] = ()):
+        self._root = {}
+        self.size = 0
+        for url in seed_urls:
+            self.add(url)
+
+    @staticmethod
+    def _hostname(url: str) -> Optional[str]:
+        try:
+            host = urlparse(url).hostname
+        except ValueError:
+            return None
+        return host.rstrip('.') if host else None
+
+    def add(self, url: str) -> None:
+        host = self._hostname(url)
+        if not host:
+            return
+        node = self._root
+        for label in reversed(host.split('.')):
+            node = node.setdefault(label, {})
+        if _END not in node:
+            node[_END] = True
+            self.size += 1
+
+    def host_in_scope(self, host: str) -> bool:
+        node = self._root
+        for label in reversed(host.lower().rstrip('.').split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+    def in_scope(self, url: str) -> bool:
+        host = self._hostname(url)
+        return bool(host) and self.host_in_scope(host)
+
+    def __len__(self) -> int:
+        return self.size
@@ -0,0 +1,147 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from lid_labels import extract_language_code
+
+SCRIPT_SETTLED = "script"
+SCRIPT_MISMATCH = "script_mismatch"
+
+# Letter ranges per ISO 15924 script, as used in GlotLID label suffixes. Digits,
+# punctuation and other common characters are deliberately left out.
+_SCRIPT_RANGES = [
+    (0x0041, 0x005A, 'Latn'), (0x0061, 0x007A, 'Latn'), (0x00C0, 0x024F, 'Latn'),
+    (0x0370, 0x03FF, 'Grek'), (0x0400, 0x052F, 'Cyrl'), (0x0531, 0x058F, 'Armn'),
+    (0x0591, 0x05FF, 'Hebr'), (0x0600, 0x06FF, 'Arab'), (0x0700, 0x074F, 'Syrc'),
+    (0x0750, 0x077F, 'Arab'), (0x0780, 0x07BF, 'Thaa'), (0x07C0, 0x07FF, 'Nkoo'),
+    (0x08A0, 0x08FF, 'Arab'), (0x0900, 0x097F, 'Deva'), (0x0980, 0x09FF, 'Beng'),
+    (0x0A00, 0x0A7F, 'Guru'), (0x0A80, 0x0AFF, 'Gujr'), (0x0B00, 0x0B7F, 'Orya'),
+    (0x0B80, 0x0BFF, 'Taml'), (0x0C00, 0x0C7F, 'Telu'), (0x0C80, 0x0CFF, 'Knda'),
+    (0x0D00, 0x0D7F, 'Mlym'), (0x0D80, 0x0DFF, 'Sinh'), (0x0E00, 0x0E7F, 'Thai'),
+    (0x0E80, 0x0EFF, 'Laoo'), (0x0F00, 0x0FFF, 'Tibt'), (0x1000, 0x109F, 'Mymr'),
+    (0x10A0, 0x10FF, 'Geor'), (0x1100, 0x11FF, 'Hang'), (0x1200, 0x139F, 'Ethi'),
+    (0x13A0, 0x13FF, 'Cher'), (0x1400, 0x167F, 'Cans'), (0x1680, 0x169F, 'Ogam'),
+    (0x16A0, 0x16FF, 'Runr'), (0x1700, 0x171F, 'Tglg'), (0x1780, 0x17FF, 'Khmr'),
+    (0x1800, 0x18AF, 'Mong'), (0x18B0, 0x18FF, 'Cans'), (0x1900, 0x194F, 'Limb'),
+    (0x1950, 0x197F, 'Tale'), (0x1980, 0x19DF, 'Talu'), (0x19E0, 0x19FF, 'Khmr'),
+    (0x1A00, 0x1A1F, 'Bugi'), (0x1A20, 0x1AAF, 'Lana'), (0x1B00, 0x1B7F, 'Bali'),
+    (0x1B80, 0x1BBF, 'Sund'), (0x1BC0, 0x1BFF, 'Batk'), (0x1C00, 0x1C4F, 'Lepc'),
+    (0x1C50, 0x1C7F, 'Olck'), (0x1C80, 0x1C8F, 'Cyrl'), (0x1C90, 0x1CBF, 'Geor'),
+    (0x1E00, 0x1EFF, 'Latn'), (0x1F00, 0x1FFF, 'Grek'), (0x2C60, 0x2C7F, 'Latn'),
+    (0x2C80, 0x2CFF, 'Copt'), (0x2D00, 0x2D2F, 'Geor'), (0x2D30, 0x2D7F, 'Tfng'),
+    (0x2D80, 0x2DDF, 'Ethi'), (0x2DE0, 0x2DFF, 'Cyrl'), (0x3040, 0x309F, 'Hira'),
+    (0x30A0, 0x30FF, 'Kana'), (0x3100, 0x312F, 'Bopo'), (0x3130, 0x318F, 'Hang'),
+    (0x31A0, 0x31BF, 'Bopo'), (0x31F0, 0x31FF, 'Kana'), (0x3400, 0x4DBF, 'Hani'),
+    (0x4E00, 0x9FFF, 'Hani'), (0xA000, 0xA4CF, 'Yiii'), (0xA4D0, 0xA4FF, 'Lisu'),
+    (0xA500, 0xA63F, 'Vaii'), (0xA640, 0xA69F, 'Cyrl'), (0xA6A0, 0xA6FF, 'Bamu'),
+    (0xA720, 0xA7FF, 'Latn'), (0xA800, 0xA82F, 'Sylo'), (0xA880, 0xA8DF, 'Saur'),
+    (0xA8E0, 0xA8FF, 'Deva'), (0xA900, 0xA92F, 'Kali'), (0xA960, 0xA97F, 'Hang'),
+    (0xA980, 0xA9DF, 'Java'), (0xAA00, 0xAA5F, 'Cham'), (0xAA60, 0xAA7F, 'Mymr'),
+    (0xAA80, 0xAADF, 'Tavt'), (0xAAE0, 0xAAFF, 'Mtei'), (0xAB00, 0xAB2F, 'Ethi'),
+    (0xAB30, 0xAB6F, 'Latn'), (0xAB70, 0xABBF, 'Cher'), (0xABC0, 0xABFF, 'Mtei'),
+    (0xAC00, 0xD7FF, 'Hang'), (0xF900, 0xFAFF, 'Hani'), (0xFB13, 0xFB17, 'Armn'),
+    (0xFB1D, 0xFB4F, 'Hebr'), (0xFB50, 0xFDFF, 'Arab'), (0xFE70, 0xFEFF, 'Arab'),
+    (0xFF21, 0xFF3A, 'Latn'), (0xFF41, 0xFF5A, 'Latn'), (0xFF66, 0xFF9F, 'Kana'),
+    (0x10330, 0x1034F, 'Goth'), (0x10400, 0x1044F, 'Dsrt'), (0x10450, 0x1047F, 'Shaw'),
+    (0x10480, 0x104AF, 'Osma'), (0x104B0, 0x104FF, 'Osge'), (0x10D00, 0x10D3F, 'Rohg'),
+    (0x11100, 0x1114F, 'Cakm'), (0x1E100, 0x1E14F, 'Hmnp'), (0x1E2C0, 0x1E2FF, 'Wcho'),
+    (0x1E900, 0x1E95F, 'Adlm'), (0x20000, 0x3134F, 'Hani'),
+]
+
+_SCRIPTS = sorted({script for _, _, script in _SCRIPT_RANGES})
+_SCRIPT_IDS = {script: i for i, script in enumerate(_SCRIPTS)}
+_STARTS = np.array([start for start, _, _ in _SCRIPT_RANGES], dtype=np.uint32)
+_ENDS = np.array([end for _, end, _ in _SCRIPT_RANGES], dtype=np.uint32)
+_RANGE_SCRIPT = np.array([_SCRIPT_IDS[script] for _, _, script in _SCRIPT_RANGES], dtype=np.intp)
+
+# Label suffixes covering several of the scripts above
+_COMPOSITE_SCRIPTS = {
+    'Jpan': {'Hira', 'Kana', 'Hani'},
+    'Kore': {'Hang', 'Hani'},
+    'Hans': {'Hani'},
+    'Hant': {'Hani'},
+}
+
+def script_histogram(text: str) -> np.ndarray:
+    """Number of letters per script in `text`, indexed like `_SCRIPTS`."""
+    code_points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    ranges = np.searchsorted(_STARTS, code_points, side='right') - 1
+    valid = ranges >= 0
+    ranges, code_points = ranges[valid], code_points[valid]
+    in_range = code_points <= _ENDS[ranges]
+    return np.bincount(_RANGE_SCRIPT[ranges[in_range]], minlength=len(_SCRIPTS))
+
+
+class ScriptPrefilter:
+    """
+    Cheap script check run before fastText for one target label.
+
+    From a histogram of the letters on the page by Unicode script:
+    - if one script covers at least `settle_share` of the letters and the
+      model has exactly one label written in it (e.g. nqo_Nkoo, lis_Lisu),
+      that label is returned with the share as its confidence;
+    - if the dominant script cannot be the target label's script and the
+      target script covers less than `min_target_share` of the letters, the
+      page is rejected.
+    Anything else, and pages with fewer than `min_letters` letters, goes to
+    fastText as before.
+    """
+
+    def __init__(self, labels: Iterable[str], target_label: str, min_letters: int = 20,
+                 settle_share: float = 0.9, min_target_share: float = 0.1):
+        self.target_label = target_label
+        self.min_letters = min_letters
+        self.settle_share = settle_share
+        self.min_target_share = min_target_share
+
+        labels_per_script = Counter()
+        script_labels = {}
+        for label in labels:
+            code = extract_language_code(label)
+            if code:
+                script = code.split('_')[-1]
+                labels_per_script[script] += 1
+                script_labels[script] = label
+        self.unique_labels = {
+            _SCRIPT_IDS[script]: script_labels[script]
+            for script, count in labels_per_script.items() if count == 1 and script in _SCRIPT_IDS
+        }
+
+        target_script = target_label.split('_')[-1]
+        target_scripts = _COMPOSITE_SCRIPTS.get(target_script, {target_script})
+        # Unknown target scripts are never rejected on script grounds
+        self.target_ids = (
+            [_SCRIPT_IDS[script] for script in target_scripts]
+            if all(script in _SCRIPT_IDS for script in target_scripts) else None
+        )
+
+    @classmethod
+    def from_config(cls, model, config: Dict[str, Any], target_label: str) -> Optional['ScriptPrefilter']:
+        """Build the prefilter from `language_detector.script_prefilter`, or None if it is disabled."""
+        prefilter_config = config['language_detector'].get('script_prefilter') or {}
+        if not prefilter_config.get('enabled', False):
+            return None
+        return cls(
+            model.get_labels(), target_label,
+            min_letters=prefilter_config.get('min_letters', 20),
+            settle_share=prefilter_config.get('settle_share', 0.9),
+            min_target_share=prefilter_config.get('min_target_share', 0.1)
+        )
+
+    def check(self, text: str):
+        """`(raw_label, confidence, decision)` if the script settles the page, otherwise None."""
+        histogram = script_histogram(text)
+        letters = int(histogram.sum())
+        if letters < self.min_letters:
+            return None
+        dominant = int(histogram.argmax())
+        dominant_share = histogram[dominant] / letters
+
+        if dominant_share >= self.settle_share and dominant in self.unique_labels:
+            return self.unique_labels[dominant], float(dominant_share), SCRIPT_SETTLED
+
+        if self.target_ids is not None and dominant not in self.target_ids:
+            if histogram[self.target_ids].sum() / letters < self.min_target_share:
+                return None, 0.0, SCRIPT_MISMATCH
+        return None
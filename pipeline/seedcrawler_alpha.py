@@ -1,18 +1,35 @@
 import os
-import re
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
 import time
 import json
 from typing import List, Dict, Any
 from tqdm import tqdm
-from trafilatura import extract, fetch_url
+from trafilatura import extract
 import fasttext
 import urllib3
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import logging
+import threading
+from collections import Counter, deque
 import yaml
+from crawl_frontier import CrawlFrontier
+from visited_filter import new_url_set, url_set_state, url_set_from_state, memory_report
+from scope_matcher import HostScopeMatcher
+from link_extractor import extract_links
+from page_store import PageStore
+from fetcher import Fetcher
+from host_scheduler import HostPoliteness, HostScheduler, host_of
+from rate_controller import HostRateController
+from revalidation_cache import RevalidationCache
+from lid_batcher import BatchingPredictor
+from lid_labels import LabelTable
+from lid_model import active_model_path, load_model
+from lid_workers import LIDWorkerPool
+from lid_budget import PrefixBudget
+from lid_cache import LIDCache
+from script_prefilter import ScriptPrefilter
+from text_extractor import TIER_FULL, TieredExtractor
+from template_filter import TemplateFilter
+from checkpoint import CheckpointStore, STAGE_CRAWLING, STAGE_FILTERING, checkpoint_saver
 
 def load_config(config_file: str) -> Dict[str, Any]:
     with open(config_file, 'r') as file:
@@ -20,6 +37,11 @@ def load_config(config_file: str) -> Dict[str, Any]:
 
 config = load_config('pipeline/config.yaml')
 
+# Rate control: frontier URLs examined per step when setting aside URLs of hosts that are not ready,
+# and the longest idle sleep while every queued host waits, so max_time is still honoured
+DEFER_SCAN = 100
+MAX_IDLE_SLEEP = 1.0
+
 log_dir = os.path.dirname(config['logging']['file_path'])
 os.makedirs(log_dir, exist_ok=True)
 
@@ -74,58 +96,136 @@ class SeedReader:
 
 class SeedCrawler:
 
-    def __init__(self, seed_urls):
+    def __init__(self, seed_urls, page_store=None, revalidation=None, fetcher=None):
         self.seed_urls = seed_urls
+        self.page_store = page_store
+        self.revalidation = revalidation
+        self.not_modified = set()  # URLs answered with 304 Not Modified in this run
+        self.scope = HostScopeMatcher(seed_urls)
         self.max_pages = config['seed_crawler']['max_pages']
         self.max_time = config['seed_crawler']['max_time']
-        self.visited = set()
-        self.to_visit = list(set(seed_urls))  # Remove duplicates
+        self.visited = new_url_set(config['seed_crawler'])
+        self.to_visit = CrawlFrontier(
+            seed_urls,
+            prioritize_depth=config['seed_crawler'].get('prioritize_depth', False),
+            seen=new_url_set(config['seed_crawler'])
+        )
         self.to_visit_growth_factor = config['seed_crawler']['to_visit_growth_factor']
         self.all_links = set(seed_urls)  # Initialize with seed URLs
-        self.session = requests.Session()
+        self.pages = {}  # HTML of crawled pages, handed to LanguageDetector to avoid refetching
+        self.fetcher = fetcher if fetcher is not None else Fetcher.from_config(config)
+        self.deferred = {}  # host -> (url, depth) pairs set aside until the host's rate delay has passed
+
+    def fetch(self, url):
+        # With revalidation, stored bodies only stand in for 304 responses
+        if self.page_store is not None and self.revalidation is None:
+            html = self.page_store.get_html(url)
+            if html is not None:
+                return html
+
+        headers = self.revalidation.conditional_headers(url) if self.revalidation is not None else {}
+        response = self.fetcher.fetch(url, headers)
+        if response is None:
+            return None
+
+        if response.status == 304:
+            self.not_modified.add(url)
+            return self.page_store.get_html(url) if self.page_store is not None else None
+        if response.status >= 400:
+            logging.error(f"Error fetching {url}: HTTP {response.status}")
+            return None
+
+        if self.revalidation is not None:
+            self.revalidation.record_response(url, response.headers)
+        if self.page_store is not None:
+            self.page_store.put(url, response.body, response.headers, response.status,
+                                 truncated=response.truncated)
+        return response.text
 
     def get_links(self, url):
-        try:
-            response = self.session.get(url, timeout=config['url_settings']['request_timeout'])
-            response.raise_for_status()
-        except (requests.RequestException, requests.HTTPError) as e:
-            logging.error(f"Error fetching {url}: {e}")
+        html = self.fetch(url)
+        if url in self.not_modified:
+            cached_links = self.revalidation.get_links(url)
+            if cached_links is not None:
+                if html is not None:
+                    self.pages[url] = html
+                return cached_links
+        if html is None:
             return set()
 
+        self.pages[url] = html
         links = set()
-        
-        try:
-            soup = BeautifulSoup(response.text, 'html.parser')
-        except Exception as e:
-            logging.warning(f"Error parsing {url} with html.parser: {e}")
-            try:
-                soup = BeautifulSoup(response.text, 'lxml')
-            except ImportError:
-                logging.error("lxml parser not available. Unable to parse the page.")
-                return set()
-            except Exception as e:
-                logging.error(f"Error parsing {url} with lxml: {e}")
-                return set()
-
-        for anchor in soup.find_all('a', href=True):
-            link = urljoin(url, anchor['href'])
-            parsed_link = urlparse(link)
-
-            if any(parsed_link.netloc.endswith(urlparse(seed).netloc) for seed in self.seed_urls) and len(link) <= config['url_settings']['max_url_length']:
+
+        for link in extract_links(html, url):
+            if (self.scope.in_scope(link) and len(link) <= config['url_settings']['max_url_length']
+                    and self.fetcher.allowed_url(link)):
                 links.add(link)
 
+        if self.revalidation is not None:
+            self.revalidation.record_links(url, links)
         return links
 
-    def crawl_websites(self):
+    def _next_url(self):
+        """
+        Next `(url, depth)` to crawl, or None if every queued host is still waiting out its delay.
+
+        Without rate control this is just the frontier. With it, URLs of hosts that are not ready
+        are set aside per host (at most DEFER_SCAN per call) and served round-robin once they are,
+        so one slow or rate-limited host does not hold up the others.
+        """
+        rate = self.fetcher.rate
+        if rate is None:
+            return self.to_visit.pop()
+        for host in list(self.deferred):
+            if rate.wait_time(host) == 0:
+                queue = self.deferred.pop(host)
+                url_depth = queue.popleft()
+                if queue:
+                    self.deferred[host] = queue  # back of the line
+                return url_depth
+        for _ in range(min(len(self.to_visit), DEFER_SCAN)):
+            url, depth = self.to_visit.pop()
+            host = host_of(url)
+            if host not in self.deferred and rate.wait_time(host) == 0:
+                return url, depth
+            self.deferred.setdefault(host, deque()).append((url, depth))
+        return None
+
+    def state(self):
+        deferred = [[url, depth] for queue in self.deferred.values() for url, depth in queue]
+        return {
+            "frontier": deferred + self.to_visit.snapshot(),
+            "visited": url_set_state(self.visited),
+            "all_links": list(self.all_links),
+        }
+
+    def restore(self, state):
+        self.visited = url_set_from_state(state['visited'], config['seed_crawler'])
+        self.all_links = set(state['all_links'])
+        # Every URL ever queued is a crawled page or a discovered link, i.e. in all_links
+        self.to_visit = CrawlFrontier.restore(
+            state['frontier'],
+            seen=url_set_from_state(state['all_links'], config['seed_crawler']),
+            prioritize_depth=config['seed_crawler'].get('prioritize_depth', False)
+        )
+        logging.info(f"Resumed crawl with {len(self.visited)} visited and {len(self.to_visit)} queued pages")
+
+    def crawl_websites(self, on_checkpoint=None, checkpoint_interval=50):
         logging.info(f"Crawling links from {len(self.seed_urls)} seed URLs")
         start_time = time.time()
-        with tqdm(total=self.max_pages, disable=not config['progress_bar']['enabled']) as pbar:
-            while self.to_visit and len(self.visited) < self.max_pages:
+        with tqdm(total=self.max_pages, initial=len(self.visited), disable=not config['progress_bar']['enabled']) as pbar:
+            while (self.to_visit or self.deferred) and len(self.visited) < self.max_pages:
                 if time.time() - start_time > self.max_time:
                     logging.info("Maximum crawl time reached. Stopping.")
                     break
 
-                current_url = self.to_visit.pop(0)
+                next_url = self._next_url()
+                if next_url is None:
+                    # Adaptive per-host pacing instead of the fixed crawl_delay
+                    wait = min(self.fetcher.rate.wait_time(host) for host in self.deferred)
+                    time.sleep(min(wait, MAX_IDLE_SLEEP))
+                    continue
+                current_url, depth = next_url
 
                 if current_url in self.visited:
                     continue
@@ -134,13 +234,16 @@ class SeedCrawler:
                 self.all_links.update(links)
 
                 for link in links:
-                    if link not in self.visited and link not in self.to_visit:
-                        self.to_visit.append(link)
+                    self.to_visit.push(link, depth + 1)
 
                 self.visited.add(current_url)
-                time.sleep(config['seed_crawler']['crawl_delay'])
+                if self.fetcher.rate is None:
+                    time.sleep(config['seed_crawler']['crawl_delay'])
                 pbar.update(1)
 
+                if on_checkpoint is not None and len(self.visited) % checkpoint_interval == 0:
+                    on_checkpoint(self.state())
+
                 if len(self.visited) % 10 == 0:
                     if len(self.to_visit) > len(self.visited) * self.to_visit_growth_factor:
                         logging.warning("To-visit list growing too fast. Possible circular link structure.")
@@ -148,38 +251,163 @@ class SeedCrawler:
 
         logging.info(f"Finished crawling links from {len(self.seed_urls)} seed URLs")
         logging.info(f"Visited {len(self.visited)} pages in {time.time() - start_time:.2f} seconds")
+        frontier_stats = self.to_visit.stats()
+        logging.info(f"Frontier: {frontier_stats['queued']} queued, {frontier_stats['seen']} seen, "
+                     f"{frontier_stats['memory_bytes'] / 1e6:.1f} MB")
+        logging.info(memory_report("Visited set", self.visited))
+        logging.info(memory_report("Frontier seen set", self.to_visit.seen))
         return self.all_links
     
 class LanguageDetector:
-    def __init__(self, model):
+    def __init__(self, model, pages=None, page_store=None, revalidation=None, not_modified=None, batcher=None,
+                 lid_pool=None, prefix_budget=None, lid_cache=None, script_filter=None, fetcher=None,
+                 extractor=None, templates=None):
         self.model = model
-
-    @staticmethod
-    def extract_language_code(input_str):
-        pattern = r'__(label)__([a-zA-Z]+_[a-zA-Z]+)'
-        match = re.search(pattern, input_str)
-        return match.group(2) if match else None
-
-    @staticmethod
-    def trafilatura_scrape(url):
-        document = fetch_url(url)
-        return extract(document)
+        self.labels = LabelTable.from_model(model)
+        self.batcher = batcher
+        self.lid_pool = lid_pool
+        self.prefix_budget = prefix_budget
+        self.lid_cache = lid_cache
+        self.script_filter = script_filter
+        self.fetcher = fetcher if fetcher is not None else Fetcher.from_config(config)
+        self.extractor = extractor
+        self.templates = templates
+        self.budget_counts = Counter()
+        self._budget_lock = threading.Lock()
+        self.model_id = active_model_path(config)
+        self.pages = pages if pages is not None else {}
+        self.page_store = page_store
+        self.revalidation = revalidation
+        self.not_modified = not_modified if not_modified is not None else set()
+
+    def fetch_html(self, url):
+        # Reuse the HTML fetched during crawling; only unvisited links hit the network
+        document = self.pages.pop(url, None)
+        # With revalidation, only pages answered with 304 come from the store
+        if document is None and self.page_store is not None and (self.revalidation is None or url in self.not_modified):
+            document = self.page_store.get_html(url)
+        if document is None:
+            response = self.fetcher.fetch(url)
+            if response is None or response.status != 200:
+                return None
+            document = response.text
+            if self.page_store is not None:
+                self.page_store.put(url, response.body, response.headers, response.status,
+                                     truncated=response.truncated)
+        return document
+
+    def clean_html(self, url, html):
+        """`html` without the host's template blocks, when templates are enabled."""
+        if self.templates is None or not html:
+            return html
+        return self.templates.clean(url, html)
+
+    def trafilatura_scrape(self, url):
+        return extract(self.clean_html(url, self.fetch_html(url)))
+
+    def extract_text(self, url, html):
+        """`(lid_text, full_text)`; `full_text` is None when the fast extraction tier settled the page."""
+        page = self.clean_html(url, html)
+        if self.extractor is None:
+            text = extract(page)
+            return text, text
+        text, tier = self.extractor.lid_text(page)
+        return text, text if tier == TIER_FULL else None
+
+    def predict_html(self, url, html):
+        """
+        `(text, label, confidence, budget)` for a fetched page, extracted and classified in the
+        worker pool if there is one. `text` is the trafilatura text, None if the fast tier settled it.
+        """
+        if self.lid_pool is not None:
+            # Templates are learned here, in the parent, and handed to the worker with the page
+            template = self.templates.template(url, html) if self.templates is not None else None
+            scraped_text, raw_label, lid_confidence, budget = self.lid_pool.classify(html, self.script_filter, template)
+            lid_label = self.labels.code(raw_label)
+        else:
+            lid_text, scraped_text = self.extract_text(url, html)
+            lid_label, lid_confidence, budget = self.classify(lid_text)
+        if budget is not None:
+            with self._budget_lock:
+                self.budget_counts[str(budget)] += 1
+        return scraped_text, lid_label, lid_confidence, budget
+
+    def _revalidate(self, url):
+        """Conditional GET for a link the crawl stage did not visit; True on 304."""
+        headers = self.revalidation.conditional_headers(url)
+        if not headers:
+            return False
+        response = self.fetcher.fetch(url, headers)
+        if response is None:
+            return False
+        if response.status == 304:
+            self.not_modified.add(url)
+            return True
+        if response.status == 200:
+            # Changed page: keep the body so trafilatura_scrape does not download it again
+            self.revalidation.record_response(url, response.headers)
+            self.pages[url] = response.text
+            if self.page_store is not None:
+                self.page_store.put(url, response.body, response.headers, response.status,
+                                     truncated=response.truncated)
+        return False
+
+    def cached_lid(self, url):
+        """LID result from an earlier run if the page is unchanged since then."""
+        if self.revalidation is None:
+            return None
+        if url not in self.not_modified and (url in self.pages or not self._revalidate(url)):
+            return None
+        return self.revalidation.get_lid(url, self.model_id)
+
+    def _predict(self, text):
+        if self.batcher is not None:
+            return self.batcher.predict(text)
+        return self.model.predict(text)
+
+    def classify(self, scraped_text):
+        """`(label, confidence, budget)`; `budget` is the prefix budget or script check that settled it, if any."""
+        if scraped_text is None:
+            return None, None, None
+        if self.script_filter is not None:
+            settled = self.script_filter.check(scraped_text)
+            if settled is not None:
+                raw_label, lid_confidence, decision = settled
+                return self.labels.code(raw_label), lid_confidence, decision
+        if self.lid_cache is not None:
+            cached = self.lid_cache.get(scraped_text)
+            if cached is not None:
+                return self.labels.code(cached[0]), cached[1], None
+        if self.prefix_budget is not None:
+            labels, probabilities, budget = self.prefix_budget.predict(self._predict, scraped_text)
+        else:
+            labels, probabilities = self._predict(scraped_text.replace('\n', ''))
+            budget = None
+        if self.lid_cache is not None:
+            self.lid_cache.put(scraped_text, labels[0], float(probabilities[0]))
+        return self.labels.code(labels[0]), float(probabilities[0]), budget
 
     def language_predict(self, scraped_text):
-        if scraped_text is not None:
-            lid_label_script = self.model.predict(scraped_text.replace('\n', ''))
-            lid_label = self.extract_language_code(lid_label_script[0][0])
-            lid_confidence = lid_label_script[1][0]
-            return lid_label, lid_confidence
-        return None, None
-
-    def filter_seeds(self, links, input_label, confidence):
-        new_list = []
-        logging.info(f"Starting to filter {len(links)} links")
-
-        with ThreadPoolExecutor(max_workers=config['seed_crawler']['max_workers']) as executor:
-            futures = [executor.submit(self.process_link, link, input_label, confidence) for link in links]
-            for future in tqdm(futures, desc="Filtering scraped links", unit="link", disable=not config['progress_bar']['enabled']):
+        lid_label, lid_confidence, _ = self.classify(scraped_text)
+        return lid_label, lid_confidence
+
+    def filter_seeds(self, links, input_label, confidence, resume=None, on_checkpoint=None, checkpoint_interval=50):
+        new_list = list(resume['filtered_links']) if resume else []
+        processed = set(resume['processed_links']) if resume else set()
+        links = [link for link in links if link not in processed]
+        logging.info(f"Starting to filter {len(links)} links ({len(processed)} already processed)")
+
+        max_workers = config['seed_crawler']['max_workers']
+        if self.lid_pool is not None:
+            # Threads only fetch here; keep enough of them to feed every LID process
+            max_workers = max(max_workers, 2 * self.lid_pool.processes)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if self.fetcher.rate is None:
+                futures = [executor.submit(self.process_link, link, input_label, confidence) for link in links]
+                completed = zip(links, futures)
+            else:
+                completed = self._paced(executor, max_workers, links, input_label, confidence)
+            for link, future in tqdm(completed, total=len(links), desc="Filtering scraped links", unit="link", disable=not config['progress_bar']['enabled']):
                 try:
                     result = future.result()
                     if result:
@@ -187,22 +415,82 @@ class LanguageDetector:
                         logging.debug(f"Appended result: {result}")
                 except Exception as e:
                     logging.error(f"Error processing link: {e}")
+                processed.add(link)
+
+                if on_checkpoint is not None and len(processed) % checkpoint_interval == 0:
+                    on_checkpoint({"processed_links": list(processed), "filtered_links": new_list})
 
         logging.info(f"Finished filtering. Found {len(new_list)} matching links")
         return new_list
 
+    def _paced(self, executor, max_workers, links, input_label, confidence):
+        """
+        Yield `(link, future)` as links finish, submitting a link that needs a download only once
+        its host is ready under rate control (see HostScheduler.next_ready), so worker threads
+        never sleep on a slow or rate-limited host while other hosts have work.
+        """
+        scheduler = HostScheduler(politeness=HostPoliteness(
+            max_per_host=config['seed_crawler'].get('max_per_host', 2), rate=self.fetcher.rate))
+        running = {}
+        scheduled = set()  # futures holding a host slot
+        for link in links:
+            if link in self.pages:
+                running[executor.submit(self.process_link, link, input_label, confidence)] = link
+            else:
+                scheduler.add(link)
+        in_flight = 0
+        while running or scheduler:
+            while in_flight < max_workers:
+                link = scheduler.next_ready()
+                if link is None:
+                    break
+                future = executor.submit(self.process_link, link, input_label, confidence)
+                running[future] = link
+                scheduled.add(future)
+                in_flight += 1
+            if not running:
+                time.sleep(min(max(scheduler.seconds_until_ready() or 0.0, 0.05), MAX_IDLE_SLEEP))
+                continue
+            # Wake up for whichever comes first: a finished link or a host leaving its delay window
+            wait_for = None if in_flight >= max_workers else scheduler.seconds_until_ready()
+            done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                link = running.pop(future)
+                if future in scheduled:
+                    scheduled.discard(future)
+                    scheduler.release(link)
+                    in_flight -= 1
+                yield link, future
+
     def process_link(self, link, input_label, confidence):
         try:
-            scraped_text = self.trafilatura_scrape(link)
-            lid_label, lid_confidence = self.language_predict(scraped_text)
+            cached = self.cached_lid(link)
+            budget = None
+            html = None
+            if cached is not None:
+                scraped_text = None
+                lid_label, lid_confidence = cached
+            else:
+                html = self.fetch_html(link)
+                scraped_text, lid_label, lid_confidence, budget = self.predict_html(link, html)
+                if self.revalidation is not None:
+                    self.revalidation.record_lid(link, lid_label, lid_confidence, self.model_id)
             
-            logging.debug(f"Link: {link}, LID Label: {lid_label}, LID Confidence: {lid_confidence}")
+            logging.debug(f"Link: {link}, LID Label: {lid_label}, LID Confidence: {lid_confidence}, Budget: {budget}")
             
             if lid_label == input_label and lid_confidence >= confidence:
                 if config['language_detector']['save_text'] == True:
-                    return {"link": link, "lid_label": lid_label, "lid_confidence": lid_confidence, "text": scraped_text}  
+                    if scraped_text is None:
+                        if html is not None:
+                            scraped_text = extract(self.clean_html(link, html))
+                        else:
+                            scraped_text = self.trafilatura_scrape(link)
+                    result = {"link": link, "lid_label": lid_label, "lid_confidence": lid_confidence, "text": scraped_text}
                 else:  
-                    return {"link": link, "lid_label": lid_label, "lid_confidence": lid_confidence}
+                    result = {"link": link, "lid_label": lid_label, "lid_confidence": lid_confidence}
+                if budget is not None:
+                    result["lid_budget"] = budget
+                return result
         except Exception as e:
             logging.error(f"Error processing link {link}: {e}")
         return None
@@ -227,7 +515,7 @@ def save_to_json(data: List[Dict[str, Any]], filename: str):
     except Exception as e:
         logging.error(f"Error saving to {filename}: {e}")
 
-def process_language(input_label: str, model: fasttext.FastText._FastText) -> None:
+def process_language(input_label: str, model: fasttext.FastText._FastText, lid_pool=None, lid_cache=None) -> None:
     """Process a single language input."""
     json_file_path = os.path.join(config['seed_reader']['input_directory'], f"{input_label}.json")
     input_confidence = config['language_detector']['minimum_confidence']
@@ -251,17 +539,70 @@ def process_language(input_label: str, model: fasttext.FastText._FastText) -> No
         logging.warning(f"No seed URLs found for language {input_label}")
         return
     
-    crawler = SeedCrawler(seed_urls)
-    all_website_links = crawler.crawl_websites()
+    page_store = PageStore.from_config(config)
+    checkpoints = CheckpointStore.from_config(config)
+    state = checkpoints.load(input_label) if checkpoints is not None else None
+
+    revalidation = RevalidationCache.from_config(config)
+    fetcher = Fetcher.from_config(config, rate=HostRateController.from_config(config))
+    crawler = SeedCrawler(seed_urls, page_store=page_store, revalidation=revalidation, fetcher=fetcher)
+    if state is not None and state.get('stage') == STAGE_FILTERING:
+        all_website_links = set(state['all_links'])
+    else:
+        if state is not None and state.get('stage') == STAGE_CRAWLING:
+            crawler.restore(state['crawl'])
+        on_crawl_checkpoint = checkpoint_saver(checkpoints, input_label, STAGE_CRAWLING, 'crawl')
+
+        try:
+            all_website_links = crawler.crawl_websites(
+                on_checkpoint=on_crawl_checkpoint,
+                checkpoint_interval=checkpoints.interval if checkpoints is not None else 50
+            )
+        except KeyboardInterrupt:
+            if on_crawl_checkpoint is not None:
+                on_crawl_checkpoint(crawler.state())
+            raise
+        if checkpoints is not None:
+            checkpoints.save(input_label, STAGE_FILTERING, all_links=list(all_website_links))
 
     links_meta_data['all_website_links'] = list(all_website_links)  # Convert set to list for JSON serialization
     links_meta_data['all_website_links_len'] = len(all_website_links)
 
-    lang_detector = LanguageDetector(model)
-    filtered_links = lang_detector.filter_seeds(all_website_links, input_label, input_confidence)
+    on_filter_checkpoint = checkpoint_saver(checkpoints, input_label, STAGE_FILTERING, 'filter',
+                                            all_links=list(all_website_links))
+
+    # With worker processes, prediction happens there and the in-process batcher is not needed
+    batcher = BatchingPredictor.from_config(model, config) if lid_pool is None else None
+    lang_detector = LanguageDetector(model, pages=crawler.pages, page_store=page_store,
+                                     revalidation=revalidation, not_modified=crawler.not_modified,
+                                     batcher=batcher, lid_pool=lid_pool,
+                                     prefix_budget=PrefixBudget.from_config(config),
+                                     lid_cache=lid_cache if lid_pool is None else None,
+                                     script_filter=ScriptPrefilter.from_config(model, config, input_label),
+                                     fetcher=fetcher, extractor=TieredExtractor.from_config(config),
+                                     templates=TemplateFilter.from_config(config))
+    try:
+        filtered_links = lang_detector.filter_seeds(
+            all_website_links, input_label, input_confidence,
+            resume=state.get('filter') if state is not None else None,
+            on_checkpoint=on_filter_checkpoint,
+            checkpoint_interval=checkpoints.interval if checkpoints is not None else 50
+        )
+    finally:
+        if batcher is not None:
+            batcher.close()
+    if lang_detector.templates is not None and lid_pool is None:
+        logging.info(lang_detector.templates.stats())
+    if fetcher.rate is not None:
+        logging.info(fetcher.rate.stats())
 
     links_meta_data['filtered_links'] = [link['link'] for link in filtered_links]
     links_meta_data['filtered_links_len'] = len(filtered_links)
+    if lang_detector.budget_counts:
+        # Decisions settled per prefix budget or by the script prefilter, over all classified links
+        links_meta_data['lid_budget_counts'] = dict(lang_detector.budget_counts)
+    # URLs not downloaded (or cut off) by the fetcher, per reason
+    links_meta_data['fetch_skipped'] = fetcher.stats()
 
     unique_links = set_minus([link['link'] for link in filtered_links], seed_urls)  # Extract links from filtered_links
     links_meta_data['unique_links'] = unique_links
@@ -295,6 +636,8 @@ def process_language(input_label: str, model: fasttext.FastText._FastText) -> No
     if os.path.exists(output_file):
         file_size = os.path.getsize(output_file)
         logging.info(f"Output file size for {input_label}: {file_size} bytes")
+        if checkpoints is not None:
+            checkpoints.mark_done(input_label)
     else:
         logging.error(f"Output file was not created for {input_label}")
 
@@ -309,18 +652,25 @@ def set_minus(list1, list2):
 
 def batch_process(input_labels: List[str]) -> None:
     """Process multiple languages in batch."""
-    model_path = config['language_detector']['model_path']
-    model = fasttext.load_model(model_path)
+    model = load_model(config)
+    lid_cache = LIDCache.from_config(config, PrefixBudget.from_config(config))
+    lid_pool = LIDWorkerPool.from_config(model, config, lid_cache=lid_cache)
     
     total_languages = len(input_labels)
     logging.info(f"Starting batch processing for {total_languages} languages")
     print(f"Starting batch processing for {total_languages} languages")
     
+    checkpoints = CheckpointStore.from_config(config)
+
     for idx, input_label in enumerate(input_labels, 1):
+        if checkpoints is not None and checkpoints.is_done(input_label):
+            logging.info(f"Skipping language {idx}/{total_languages}: {input_label} (already completed)")
+            continue
+
         logging.info(f"Processing language {idx}/{total_languages}: {input_label}")
         print(f"Processing language {idx}/{total_languages}: {input_label}")
         try:
-            process_language(input_label, model)
+            process_language(input_label, model, lid_pool=lid_pool, lid_cache=lid_cache)
         except Exception as e:
             logging.error(f"Error processing language {input_label}: {e}")
             continue
@@ -331,6 +681,10 @@ def batch_process(input_labels: List[str]) -> None:
             print(f"Cooling down for {cooldown} seconds before processing next language")
             time.sleep(cooldown)
     
+    if lid_pool is not None:
+        lid_pool.close()
+    if lid_cache is not None and lid_pool is None:
+        logging.info(lid_cache.stats())
     logging.info("Batch processing completed")
     print("Batch processing completed")
 
@@ -345,6 +699,11 @@ if __name__ == "__main__":
     else:
         # Original single language processing
         input_label = config['language_detector']['desired_language']
-        model_path = config['language_detector']['model_path']
-        model = fasttext.load_model(model_path)
-        process_language(input_label, model)
+        model = load_model(config)
+        lid_cache = LIDCache.from_config(config, PrefixBudget.from_config(config))
+        lid_pool = LIDWorkerPool.from_config(model, config, lid_cache=lid_cache)
+        try:
+            process_language(input_label, model, lid_pool=lid_pool, lid_cache=lid_cache)
+        finally:
+            if lid_pool is not None:
+                lid_pool.close()
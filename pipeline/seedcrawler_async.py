@@ -1,22 +1,39 @@
 import os
-import re
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
 import time
 import json
 from typing import List, Dict, Any, Set
 from tqdm import tqdm
-from trafilatura import extract, fetch_url
+from trafilatura import extract
 import fasttext
+import multiprocessing
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 import yaml
 import aiohttp
 import asyncio
 from cachetools import TTLCache
-from functools import lru_cache
+from collections import Counter
+from contextlib import asynccontextmanager
 import urllib3
+from visited_filter import new_url_set, url_set_state, url_set_from_state, memory_report
+from host_scheduler import HostPoliteness, HostScheduler
+from scope_matcher import HostScopeMatcher
+from link_extractor import extract_links
+from page_store import PageStore
+from fetcher import Fetcher
+from http_session import SessionFactory
+from rate_controller import HostRateController
+from revalidation_cache import RevalidationCache
+from lid_batcher import BatchingPredictor
+from lid_labels import LabelTable
+from lid_workers import LIDWorkerPool
+from lid_model import active_model_path, load_model
+from lid_budget import PrefixBudget
+from lid_cache import LIDCache
+from script_prefilter import ScriptPrefilter
+from text_extractor import TieredExtractor
+from template_filter import TemplateFilter
+from checkpoint import CheckpointStore, STAGE_CRAWLING, STAGE_FILTERING, checkpoint_saver
 
 def load_config(config_file: str) -> Dict[str, Any]:
     with open(config_file, 'r') as file:
@@ -76,131 +93,388 @@ class SeedReader:
         return filtered_data
 
 class OptimizedSeedCrawler:
-    def __init__(self, seed_urls):
+    def __init__(self, seed_urls, page_store=None, politeness=None, revalidation=None, fetcher=None):
         self.seed_urls = seed_urls
+        self.page_store = page_store
+        self.fetcher = fetcher if fetcher is not None else Fetcher.from_config(config)
+        self.revalidation = revalidation
+        self.not_modified = set()  # URLs answered with 304 Not Modified in this run
+        self.scope = HostScopeMatcher(seed_urls)
         self.max_pages = config['seed_crawler']['max_pages']
         self.max_time = config['seed_crawler']['max_time']
-        self.visited = set()
-        self.to_visit = set(seed_urls)  # Using set for O(1) lookup
+        self.visited = new_url_set(config['seed_crawler'])
+        self.politeness = politeness
+        self.to_visit = self._new_frontier(seed_urls)
+        self.in_progress = set()
         self.all_links = set(seed_urls)
         self.url_cache = TTLCache(maxsize=1000, ttl=3600)  # Cache URLs for 1 hour
+        self.pages = {}  # HTML of crawled pages, handed to the language detector
         
     async def get_links(self, url: str, session: aiohttp.ClientSession) -> Set[str]:
         if url in self.url_cache:
             return self.url_cache[url]
             
         try:
-            async with session.get(url, timeout=config['url_settings']['request_timeout']) as response:
-                if response.status != 200:
+            # With revalidation, stored bodies only stand in for 304 responses
+            html = self._stored_html(url) if self.revalidation is None else None
+            if html is None:
+                headers = self.revalidation.conditional_headers(url) if self.revalidation is not None else {}
+                response = await self.fetcher.fetch_async(session, url, headers)
+                if response is None:
                     return set()
-                html = await response.text()
-                
-                soup = BeautifulSoup(html, 'lxml')  # Using lxml parser for better performance
-                links = {
-                    urljoin(url, anchor['href'])
-                    for anchor in soup.find_all('a', href=True)
-                    if self._is_valid_link(anchor['href'], url)
-                }
-                
-                self.url_cache[url] = links
-                return links
-                
+                if response.status == 304:
+                    self.not_modified.add(url)
+                    links = self.revalidation.get_links(url)
+                    if links is not None:
+                        self.url_cache[url] = links
+                        return links
+                    html = self._stored_html(url)
+                    if html is None:
+                        return set()
+                elif response.status != 200:
+                    return set()
+                else:
+                    html = response.text
+                    if self.revalidation is not None:
+                        self.revalidation.record_response(url, response.headers)
+                    if self.page_store is not None:
+                        self.page_store.put(url, response.body, response.headers, response.status,
+                                             truncated=response.truncated)
+            self.pages[url] = html
+
+            links = {link for link in extract_links(html, url) if self._is_valid_link(link)}
+
+            if self.revalidation is not None:
+                self.revalidation.record_links(url, links)
+            self.url_cache[url] = links
+            return links
+
         except Exception as e:
             logging.error(f"Error fetching {url}: {e}")
             return set()
 
-    @lru_cache(maxsize=1000)
-    def _is_valid_link(self, href: str, base_url: str) -> bool:
-        link = urljoin(base_url, href)
-        parsed_link = urlparse(link)
+    def _stored_html(self, url: str):
+        return self.page_store.get_html(url) if self.page_store is not None else None
+
+    def _is_valid_link(self, link: str) -> bool:
         return (
-            any(parsed_link.netloc.endswith(urlparse(seed).netloc) for seed in self.seed_urls)
+            self.scope.in_scope(link)
             and len(link) <= config['url_settings']['max_url_length']
+            and self.fetcher.allowed_url(link)
         )
 
-    async def crawl_websites(self):
-        async with aiohttp.ClientSession() as session:
-            tasks = []
+    async def _fetch(self, url: str, session: aiohttp.ClientSession):
+        self.in_progress.add(url)
+        try:
+            return url, await self.get_links(url, session)
+        finally:
+            self.in_progress.discard(url)
+            self.to_visit.release(url)
+
+    def state(self):
+        # In-flight URLs go back into the queue so a resumed crawl fetches them again
+        return {
+            "frontier": list(self.to_visit) + list(self.in_progress),
+            "visited": url_set_state(self.visited),
+            "all_links": list(self.all_links),
+        }
+
+    def _new_frontier(self, urls):
+        frontier = HostScheduler(
+            max_per_host=config['seed_crawler'].get('max_per_host', 2),
+            per_host_delay=config['seed_crawler'].get('per_host_delay', 0.0),
+            politeness=self.politeness
+        )
+        frontier.update(urls)
+        return frontier
+
+    def restore(self, state):
+        self.visited = url_set_from_state(state['visited'], config['seed_crawler'])
+        self.all_links = set(state['all_links'])
+        # Replaces the seed queue from __init__; seeds still to crawl are in the checkpoint frontier
+        self.to_visit = self._new_frontier(url for url in state['frontier'] if url not in self.visited)
+        logging.info(f"Resumed crawl with {len(self.visited)} visited and {len(self.to_visit)} queued pages")
+
+    async def crawl_websites(self, session=None, on_checkpoint=None, checkpoint_interval=50):
+        max_in_flight = config['seed_crawler'].get('max_in_flight', 50)
+        async with session_scope(session) as session:
+            in_flight = set()
             start_time = time.time()
-            
-            with tqdm(total=self.max_pages, disable=not config['progress_bar']['enabled']) as pbar:
-                while self.to_visit and len(self.visited) < self.max_pages:
+            last_checkpoint = len(self.visited)
+
+            with tqdm(total=self.max_pages, initial=len(self.visited), disable=not config['progress_bar']['enabled']) as pbar:
+                while (self.to_visit or in_flight) and len(self.visited) < self.max_pages:
                     if time.time() - start_time > self.max_time:
+                        logging.info("Maximum crawl time reached. Stopping.")
                         break
 
-                    # Process URLs in batches
-                    batch_size = min(50, len(self.to_visit))
-                    current_batch = set(list(self.to_visit)[:batch_size])
-                    self.to_visit -= current_batch
-                    
-                    new_tasks = [self.get_links(url, session) for url in current_batch]
-                    batch_results = await asyncio.gather(*new_tasks)
-                    
-                    for url, links in zip(current_batch, batch_results):
+                    # Refill the pool as slots free up instead of waiting for a whole batch
+                    while (len(in_flight) < max_in_flight
+                           and len(self.visited) + len(in_flight) < self.max_pages):
+                        url = self.to_visit.next_ready()
+                        if url is None:
+                            break
+                        in_flight.add(asyncio.create_task(self._fetch(url, session)))
+
+                    if not in_flight:
+                        # Every queued host is inside its politeness delay or busy with another language
+                        wait = self.to_visit.seconds_until_ready()
+                        await asyncio.sleep(wait if wait is not None else 0.05)
+                        continue
+
+                    has_room = (len(in_flight) < max_in_flight
+                                and len(self.visited) + len(in_flight) < self.max_pages)
+                    done, in_flight = await asyncio.wait(
+                        in_flight,
+                        timeout=self.to_visit.seconds_until_ready() if has_room else None,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                    for task in done:
+                        url, links = task.result()
                         self.all_links.update(links)
                         self.visited.add(url)
-                        self.to_visit.update(links - self.visited)
+                        for link in links:
+                            if link not in self.visited and link not in self.in_progress:
+                                self.to_visit.add(link)
                         pbar.update(1)
 
+                    if on_checkpoint is not None and len(self.visited) - last_checkpoint >= checkpoint_interval:
+                        on_checkpoint(self.state())
+                        last_checkpoint = len(self.visited)
+
+                for task in in_flight:
+                    task.cancel()
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+            logging.info(memory_report("Visited set", self.visited))
+
             return self.all_links
 
 class OptimizedLanguageDetector:
-    def __init__(self, model):
+    def __init__(self, model, pages=None, page_store=None, politeness=None, revalidation=None, not_modified=None,
+                 batcher=None, prefix_budget=None, lid_cache=None, script_filter=None,
+                 lid_pool=None, cpu_threads=None, cpu_slots=None, fetcher=None, extractor=None, templates=None):
         self.model = model
+        self.labels = LabelTable.from_model(model)
+        self.batcher = batcher
+        self.prefix_budget = prefix_budget
+        self.lid_cache = lid_cache
+        self.script_filter = script_filter
+        # Extraction and LID run in lid_pool (processes) or cpu_threads, never on the event loop,
+        # with at most cpu_slots pages waiting for or in either
+        self.lid_pool = lid_pool
+        self.cpu_threads = cpu_threads
+        self.cpu_slots = cpu_slots if cpu_slots is not None else asyncio.Semaphore(64)
+        self.budget_counts = Counter()
+        self.model_id = active_model_path(config)
+        self.pages = pages if pages is not None else {}
+        self.page_store = page_store
+        self.politeness = politeness
+        self.revalidation = revalidation
+        self.not_modified = not_modified if not_modified is not None else set()
         self.text_cache = TTLCache(maxsize=1000, ttl=3600)
+        self.fetcher = fetcher if fetcher is not None else Fetcher.from_config(config)
+        # Text is not saved by the async pipeline, so the fast tier alone is enough when it finds text
+        self.extractor = extractor
+        self.templates = templates
         
-    @lru_cache(maxsize=1000)
-    def extract_language_code(self, input_str):
-        pattern = r'__(label)__([a-zA-Z]+_[a-zA-Z]+)'
-        match = re.search(pattern, input_str)
-        return match.group(2) if match else None
-
     def language_predict(self, scraped_text):
         if scraped_text is not None:
             lid_label_script = self.model.predict(scraped_text.replace('\n', ''))
-            lid_label = self.extract_language_code(lid_label_script[0][0])
+            lid_label = self.labels.code(lid_label_script[0][0])
             lid_confidence = lid_label_script[1][0]
             return lid_label, lid_confidence
         return None, None
 
+    async def _predict_async(self, text):
+        if self.batcher is not None:
+            return await asyncio.wrap_future(self.batcher.submit(text))
+        if self.cpu_threads is not None:
+            return await asyncio.get_running_loop().run_in_executor(self.cpu_threads, self.model.predict, text)
+        return self.model.predict(text)
+
+    async def _template(self, url, html):
+        """Host template for a page sent to the worker pool; templates are learned here, not in the workers."""
+        if self.templates is None:
+            return None
+        template = self.templates.template(url)
+        if template is None and html:
+            # Still learning this host: parse the page off the event loop
+            template = await asyncio.get_running_loop().run_in_executor(None, self.templates.template, url, html)
+        return template
+
+    def _lid_text(self, url, html):
+        if self.templates is not None and html:
+            html = self.templates.clean(url, html)
+        if self.extractor is None:
+            return extract(html)
+        return self.extractor.lid_text(html)[0]
+
+    async def _extract(self, url, html):
+        if self.cpu_threads is not None:
+            return await asyncio.get_running_loop().run_in_executor(self.cpu_threads, self._lid_text, url, html)
+        return self._lid_text(url, html)
+
+    async def classify_async(self, scraped_text):
+        """`(label, confidence, budget)`; `budget` is the prefix budget or script check that settled it, if any."""
+        if scraped_text is None:
+            return None, None, None
+        if self.script_filter is not None:
+            settled = self.script_filter.check(scraped_text)
+            if settled is not None:
+                raw_label, lid_confidence, decision = settled
+                self.budget_counts[decision] += 1
+                return self.labels.code(raw_label), lid_confidence, decision
+        if self.lid_cache is not None:
+            cached = self.lid_cache.get(scraped_text)
+            if cached is not None:
+                return self.labels.code(cached[0]), cached[1], None
+        if self.prefix_budget is not None:
+            labels, probabilities, budget = await self.prefix_budget.predict_async(self._predict_async, scraped_text)
+            self.budget_counts[str(budget)] += 1
+        else:
+            labels, probabilities = await self._predict_async(scraped_text.replace('\n', ''))
+            budget = None
+        if self.lid_cache is not None:
+            self.lid_cache.put(scraped_text, labels[0], float(probabilities[0]))
+        return self.labels.code(labels[0]), float(probabilities[0]), budget
+
+    async def language_predict_async(self, scraped_text):
+        """Like language_predict, but goes through the shared micro-batcher when one is configured."""
+        lid_label, lid_confidence, _ = await self.classify_async(scraped_text)
+        return lid_label, lid_confidence
+
+    async def _polite_fetch(self, url: str, session: aiohttp.ClientSession, headers=None):
+        """`fetcher.fetch_async` inside one of the host's politeness slots."""
+        host = await self.politeness.wait_for_slot(url) if self.politeness is not None else None
+        try:
+            return await self.fetcher.fetch_async(session, url, headers)
+        finally:
+            if host is not None:
+                self.politeness.release(host)
+
+    async def _revalidate(self, url: str, session: aiohttp.ClientSession) -> bool:
+        """Conditional GET for a link the crawl stage did not visit; True on 304."""
+        headers = self.revalidation.conditional_headers(url)
+        if not headers:
+            return False
+        response = await self._polite_fetch(url, session, headers)
+        if response is None:
+            return False
+        if response.status == 304:
+            self.not_modified.add(url)
+            return True
+        if response.status == 200:
+            # Changed page: keep the body so trafilatura_scrape does not download it again
+            self.pages[url] = response.text
+            self.revalidation.record_response(url, response.headers)
+            if self.page_store is not None:
+                self.page_store.put(url, response.body, response.headers, response.status,
+                                     truncated=response.truncated)
+        return False
+
+    async def cached_lid(self, url: str, session: aiohttp.ClientSession):
+        """LID result from an earlier run if the page is unchanged since then."""
+        if self.revalidation is None:
+            return None
+        if url not in self.not_modified and (url in self.pages or not await self._revalidate(url, session)):
+            return None
+        return self.revalidation.get_lid(url, self.model_id)
+
+    async def _fetch_html(self, url: str, session: aiohttp.ClientSession):
+        html = self.pages.pop(url, None)
+        # With revalidation, only pages answered with 304 come from the store
+        if html is None and self.page_store is not None and (self.revalidation is None or url in self.not_modified):
+            html = self.page_store.get_html(url)
+        if html is None:
+            response = await self._polite_fetch(url, session)
+            if response is None or response.status != 200:
+                return None
+            html = response.text
+            if self.page_store is not None:
+                self.page_store.put(url, response.body, response.headers, response.status,
+                                     truncated=response.truncated)
+        return html
+
     async def trafilatura_scrape(self, url: str, session: aiohttp.ClientSession):
         try:
             if url in self.text_cache:
                 return self.text_cache[url]
-                
-            async with session.get(url) as response:
-                html = await response.text()
-                text = extract(html)
-                if text:
-                    self.text_cache[url] = text
-                return text
+
+            html = await self._fetch_html(url, session)
+            async with self.cpu_slots:
+                text = await self._extract(url, html)
+            if text:
+                self.text_cache[url] = text
+            return text
         except Exception as e:
             logging.error(f"Error scraping {url}: {e}")
             return None
 
+    async def scrape_and_classify(self, url: str, session: aiohttp.ClientSession):
+        """`(label, confidence, budget)` for a page, or None if no text could be extracted."""
+        if self.lid_pool is None:
+            scraped_text = await self.trafilatura_scrape(url, session)
+            if not scraped_text:
+                return None
+            async with self.cpu_slots:
+                return await self.classify_async(scraped_text)
+
+        html = await self._fetch_html(url, session)
+        if not html:
+            return None
+        async with self.cpu_slots:
+            template = await self._template(url, html)
+            _, raw_label, lid_confidence, budget = await asyncio.wrap_future(
+                self.lid_pool.submit(html, self.script_filter, template)
+            )
+        if raw_label is None and lid_confidence is None:
+            return None
+        if budget is not None:
+            self.budget_counts[str(budget)] += 1
+        return self.labels.code(raw_label), lid_confidence, budget
+
     async def process_link_async(self, link: str, input_label: str, confidence: float, session: aiohttp.ClientSession):
         try:
-            scraped_text = await self.trafilatura_scrape(link, session)
-            if scraped_text:
-                lid_label, lid_confidence = self.language_predict(scraped_text)
-                
-                if lid_label == input_label and lid_confidence >= confidence:
-                    return {
-                        "link": link,
-                        "lid_label": lid_label,
-                        "lid_confidence": lid_confidence,
-                        "text": "" if config['language_detector']['save_text'] else None
-                    }
+            cached = await self.cached_lid(link, session)
+            budget = None
+            if cached is not None:
+                lid_label, lid_confidence = cached
+            else:
+                classified = await self.scrape_and_classify(link, session)
+                if classified is None:
+                    return None
+                lid_label, lid_confidence, budget = classified
+                if self.revalidation is not None:
+                    self.revalidation.record_lid(link, lid_label, lid_confidence, self.model_id)
+
+            if lid_label == input_label and lid_confidence >= confidence:
+                result = {
+                    "link": link,
+                    "lid_label": lid_label,
+                    "lid_confidence": lid_confidence,
+                    "text": "" if config['language_detector']['save_text'] else None
+                }
+                if budget is not None:
+                    result["lid_budget"] = budget
+                return result
         except Exception as e:
             logging.error(f"Error processing link {link}: {e}")
         return None
 
-    async def filter_seeds_async(self, links: List[str], input_label: str, confidence: float):
-        new_list = []
-        async with aiohttp.ClientSession() as session:
+    async def _process_with_link(self, link: str, input_label: str, confidence: float, session: aiohttp.ClientSession):
+        return link, await self.process_link_async(link, input_label, confidence, session)
+
+    async def filter_seeds_async(self, links: List[str], input_label: str, confidence: float,
+                                 session=None, resume=None, on_checkpoint=None, checkpoint_interval=50):
+        new_list = list(resume['filtered_links']) if resume else []
+        processed_links = set(resume['processed_links']) if resume else set()
+        async with session_scope(session) as session:
             tasks = [
-                self.process_link_async(link, input_label, confidence, session)
+                self._process_with_link(link, input_label, confidence, session)
                 for link in links
+                if link not in processed_links
             ]
             
             for result in tqdm(
@@ -210,14 +484,61 @@ class OptimizedLanguageDetector:
                 disable=not config['progress_bar']['enabled']
             ):
                 try:
-                    processed = await result
+                    link, processed = await result
                     if processed:
                         new_list.append(processed)
+                    processed_links.add(link)
                 except Exception as e:
                     logging.error(f"Error in filter_seeds_async: {e}")
+
+                if on_checkpoint is not None and len(processed_links) % checkpoint_interval == 0:
+                    on_checkpoint({"processed_links": list(processed_links), "filtered_links": new_list})
                     
         return new_list
 
+class CPUStage:
+    """
+    Where the async pipeline runs extraction and LID, chosen by
+    `language_detector.cpu_workers.async_executor`: forked LID worker
+    processes ("process", the default), a thread pool ("thread") or inline on
+    the event loop ("inline"). `slots` bounds how many pages may be waiting
+    for or inside the stage at once.
+    """
+
+    def __init__(self, model, lid_cache=None):
+        workers = config['language_detector'].get('cpu_workers') or {}
+        mode = workers.get('async_executor', 'process')
+        processes = workers.get('processes') or os.cpu_count() or 1
+        if mode == 'process' and 'fork' not in multiprocessing.get_all_start_methods():
+            logging.warning("LID worker processes need the 'fork' start method; using a thread pool")
+            mode = 'thread'
+        self.lid_pool = None
+        self.threads = None
+        if mode == 'process':
+            self.lid_pool = LIDWorkerPool(model, processes=processes, prefix_budget=PrefixBudget.from_config(config),
+                                          lid_cache=lid_cache, extractor=TieredExtractor.from_config(config))
+        elif mode == 'thread':
+            self.threads = ThreadPoolExecutor(max_workers=processes, thread_name_prefix='cpu-stage')
+        self.slots = asyncio.Semaphore(workers.get('max_pending') or 2 * processes)
+
+    def close(self) -> None:
+        if self.lid_pool is not None:
+            self.lid_pool.close()
+        if self.threads is not None:
+            self.threads.shutdown()
+
+@asynccontextmanager
+async def session_scope(session: aiohttp.ClientSession = None):
+    """Use the shared session when one is given, otherwise open a private one with the configured connector."""
+    if session is not None:
+        yield session
+    else:
+        factory = SessionFactory.from_config(config)
+        try:
+            yield factory.session()
+        finally:
+            await factory.close()
+
 def remove_entries_with_domains(final_list):
     with open(config['domain_file'], 'r') as f:
         domains = [line.strip() for line in f.readlines()]
@@ -244,7 +565,26 @@ def set_minus(list1, list2):
     uncommon_elements = set1 - set2
     return list(uncommon_elements)
 
-async def process_language_async(input_label: str, model: fasttext.FastText._FastText) -> None:
+async def process_language_async(input_label: str, model: fasttext.FastText._FastText,
+                                 session: aiohttp.ClientSession = None, politeness: HostPoliteness = None,
+                                 batcher: BatchingPredictor = None, lid_cache: LIDCache = None,
+                                 cpu_stage: CPUStage = None) -> None:
+    if session is None:
+        own_cpu_stage = cpu_stage is None
+        if own_cpu_stage:
+            # Forked before the session and crawl start any threads, as in batch_process_async
+            if lid_cache is None:
+                lid_cache = LIDCache.from_config(config, PrefixBudget.from_config(config))
+            cpu_stage = CPUStage(model, lid_cache=lid_cache)
+        try:
+            # One session for both stages, so connections and DNS lookups are reused between them
+            async with session_scope() as session:
+                return await process_language_async(input_label, model, session=session, politeness=politeness,
+                                                    batcher=batcher, lid_cache=lid_cache, cpu_stage=cpu_stage)
+        finally:
+            if own_cpu_stage:
+                cpu_stage.close()
+
     json_file_path = os.path.join(config['seed_reader']['input_directory'], f"{input_label}.json")
     input_confidence = config['language_detector']['minimum_confidence']
     
@@ -264,17 +604,91 @@ async def process_language_async(input_label: str, model: fasttext.FastText._Fas
         logging.warning(f"No seed URLs found for language {input_label}")
         return
     
-    crawler = OptimizedSeedCrawler(seed_urls)
-    all_website_links = await crawler.crawl_websites()
+    page_store = PageStore.from_config(config)
+    checkpoints = CheckpointStore.from_config(config)
+    state = checkpoints.load(input_label) if checkpoints is not None else None
+
+    revalidation = RevalidationCache.from_config(config)
+    own_politeness = politeness is None
+    if own_politeness:
+        # Shared by the crawl and filter stages of this language
+        politeness = HostPoliteness(
+            max_per_host=config['seed_crawler'].get('max_per_host', 2),
+            per_host_delay=config['seed_crawler'].get('per_host_delay', 0.0),
+            rate=HostRateController.from_config(config)
+        )
+    fetcher = Fetcher.from_config(config, rate=politeness.rate)
+    crawler = OptimizedSeedCrawler(seed_urls, page_store=page_store, politeness=politeness, revalidation=revalidation,
+                                   fetcher=fetcher)
+    if state is not None and state.get('stage') == STAGE_FILTERING:
+        all_website_links = set(state['all_links'])
+    else:
+        if state is not None and state.get('stage') == STAGE_CRAWLING:
+            crawler.restore(state['crawl'])
+        on_crawl_checkpoint = checkpoint_saver(checkpoints, input_label, STAGE_CRAWLING, 'crawl')
+
+        try:
+            all_website_links = await crawler.crawl_websites(
+                session=session,
+                on_checkpoint=on_crawl_checkpoint,
+                checkpoint_interval=checkpoints.interval if checkpoints is not None else 50
+            )
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            if on_crawl_checkpoint is not None:
+                on_crawl_checkpoint(crawler.state())
+            raise
+        if checkpoints is not None:
+            checkpoints.save(input_label, STAGE_FILTERING, all_links=list(all_website_links))
 
     links_meta_data['all_website_links'] = list(all_website_links)
     links_meta_data['all_website_links_len'] = len(all_website_links)
 
-    lang_detector = OptimizedLanguageDetector(model)
-    filtered_links = await lang_detector.filter_seeds_async(all_website_links, input_label, input_confidence)
+    on_filter_checkpoint = checkpoint_saver(checkpoints, input_label, STAGE_FILTERING, 'filter',
+                                            all_links=list(all_website_links))
+
+    prefix_budget = PrefixBudget.from_config(config)
+    if lid_cache is None:
+        lid_cache = LIDCache.from_config(config, prefix_budget)
+    own_cpu_stage = cpu_stage is None
+    if own_cpu_stage:
+        cpu_stage = CPUStage(model, lid_cache=lid_cache)
+    # Worker processes predict on their own; the in-process batcher only serves threads and the loop
+    own_batcher = batcher is None and cpu_stage.lid_pool is None
+    if own_batcher:
+        batcher = BatchingPredictor.from_config(model, config)
+    lang_detector = OptimizedLanguageDetector(model, pages=crawler.pages, page_store=page_store, politeness=politeness,
+                                              revalidation=revalidation, not_modified=crawler.not_modified,
+                                              batcher=batcher, prefix_budget=prefix_budget, lid_cache=lid_cache,
+                                              script_filter=ScriptPrefilter.from_config(model, config, input_label),
+                                              lid_pool=cpu_stage.lid_pool, cpu_threads=cpu_stage.threads,
+                                              cpu_slots=cpu_stage.slots, fetcher=fetcher,
+                                              extractor=TieredExtractor.from_config(config),
+                                              templates=TemplateFilter.from_config(config))
+    try:
+        filtered_links = await lang_detector.filter_seeds_async(
+            all_website_links, input_label, input_confidence,
+            session=session,
+            resume=state.get('filter') if state is not None else None,
+            on_checkpoint=on_filter_checkpoint,
+            checkpoint_interval=checkpoints.interval if checkpoints is not None else 50
+        )
+    finally:
+        if own_batcher and batcher is not None:
+            batcher.close()
+        if own_cpu_stage:
+            cpu_stage.close()
+    if lang_detector.templates is not None and cpu_stage.lid_pool is None:
+        logging.info(lang_detector.templates.stats())
+    if own_politeness and politeness.rate is not None:
+        logging.info(politeness.rate.stats())
 
     links_meta_data['filtered_links'] = [link['link'] for link in filtered_links]
     links_meta_data['filtered_links_len'] = len(filtered_links)
+    if lang_detector.budget_counts:
+        # Decisions settled per prefix budget or by the script prefilter, over all classified links
+        links_meta_data['lid_budget_counts'] = dict(lang_detector.budget_counts)
+    # URLs not downloaded (or cut off) by the fetcher, per reason
+    links_meta_data['fetch_skipped'] = fetcher.stats()
 
     unique_links = set_minus([link['link'] for link in filtered_links], seed_urls)
     links_meta_data['unique_links'] = list(unique_links)
@@ -300,28 +714,61 @@ async def process_language_async(input_label: str, model: fasttext.FastText._Fas
                               config['output']['output_file_name'].format(language=input_label))
     save_to_json(filtered_links, output_file)
 
+    if checkpoints is not None and os.path.exists(output_file):
+        checkpoints.mark_done(input_label)
+
 async def batch_process_async(input_labels: List[str]) -> None:
-    model_path = config['language_detector']['model_path']
-    model = fasttext.load_model(model_path)
+    """Process languages concurrently over one shared HTTP session, under per-host politeness."""
+    model = load_model(config)
+    lid_cache = LIDCache.from_config(config, PrefixBudget.from_config(config))
+    # Forked before the session and batcher start any threads
+    cpu_stage = CPUStage(model, lid_cache=lid_cache)
+    batch_config = config.get('batch_processing', {})
     
     total_languages = len(input_labels)
     logging.info(f"Starting batch processing for {total_languages} languages")
     print(f"Starting batch processing for {total_languages} languages")
-    
-    for idx, input_label in enumerate(input_labels, 1):
-        logging.info(f"Processing language {idx}/{total_languages}: {input_label}")
-        print(f"Processing language {idx}/{total_languages}: {input_label}")
-        try:
-            await process_language_async(input_label, model)
-        except Exception as e:
-            logging.error(f"Error processing language {input_label}: {e}")
-            continue
-            
-        if idx < total_languages:
-            cooldown = config.get('batch_processing', {}).get('cooldown_between_languages', 60)
-            logging.info(f"Cooling down for {cooldown} seconds before processing next language")
-            print(f"Cooling down for {cooldown} seconds before processing next language")
-            await asyncio.sleep(cooldown)
+
+    checkpoints = CheckpointStore.from_config(config)
+    politeness = HostPoliteness(
+        max_per_host=config['seed_crawler'].get('max_per_host', 2),
+        per_host_delay=config['seed_crawler'].get('per_host_delay', 0.0),
+        rate=HostRateController.from_config(config)
+    )
+    # One batcher for all concurrent languages so batches fill up faster
+    batcher = BatchingPredictor.from_config(model, config) if cpu_stage.lid_pool is None else None
+    language_slots = asyncio.Semaphore(batch_config.get('max_concurrent_languages', 4))
+    sessions = SessionFactory.from_config(config)
+
+    async def run_language(idx: int, input_label: str) -> None:
+        if checkpoints is not None and checkpoints.is_done(input_label):
+            logging.info(f"Skipping language {idx}/{total_languages}: {input_label} (already completed)")
+            return
+
+        async with language_slots:
+            logging.info(f"Processing language {idx}/{total_languages}: {input_label}")
+            print(f"Processing language {idx}/{total_languages}: {input_label}")
+            try:
+                await process_language_async(input_label, model, session=session, politeness=politeness,
+                                             batcher=batcher, lid_cache=lid_cache, cpu_stage=cpu_stage)
+            except Exception as e:
+                logging.error(f"Error processing language {input_label}: {e}")
+
+    session = sessions.session()
+    try:
+        await asyncio.gather(*(
+            run_language(idx, input_label) for idx, input_label in enumerate(input_labels, 1)
+        ))
+    finally:
+        await sessions.close()
+        if batcher is not None:
+            batcher.close()
+        cpu_stage.close()
+    if lid_cache is not None and cpu_stage.lid_pool is None:
+        # With worker processes the cache is consulted in the workers; the parent's counts stay at zero
+        logging.info(lid_cache.stats())
+    if politeness.rate is not None:
+        logging.info(politeness.rate.stats())
     
     logging.info("Batch processing completed")
     print("Batch processing completed")
@@ -335,8 +782,7 @@ if __name__ == "__main__":
             asyncio.run(batch_process_async(input_labels))
     else:
         input_label = config['language_detector']['desired_language']
-        model_path = config['language_detector']['model_path']
-        model = fasttext.load_model(model_path)
+        model = load_model(config)
         asyncio.run(process_language_async(input_label, model))
 
 # if __name__ == "__main__":
@@ -0,0 +1,189 @@
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from lxml import etree
+from trafilatura.utils import load_html
+
+from host_scheduler import host_of
+
+# Containers whose text is fingerprinted; body and html would only match on duplicate pages
+_BLOCK_TAGS = frozenset({
+    'div', 'nav', 'header', 'footer', 'aside', 'section', 'article', 'main', 'form',
+    'ul', 'ol', 'dl', 'li', 'table', 'tr', 'td', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'blockquote', 'figure', 'figcaption', 'address', 'center',
+})
+
+
+class _HostTemplate:
+    __slots__ = ('urls', 'counts', 'blocks')
+
+    def __init__(self):
+        self.urls = set()
+        self.counts = Counter()
+        self.blocks = None  # fingerprints of template blocks once learned
+
+
+def _normalized(text: Optional[str]) -> bytes:
+    return ' '.join(text.split()).encode('utf-8', 'surrogatepass') if text else b''
+
+
+def _scan(tree, template: Optional[FrozenSet[bytes]] = None) -> Tuple[Set[bytes], List]:
+    """
+    Fingerprint every block element of `tree` in one bottom-up pass.
+
+    An element's fingerprint hashes its tag, its own text and, in order, the
+    fingerprints and tails of its children (whitespace-normalized), so each
+    node is hashed once instead of re-reading the text of its whole subtree.
+    Returns the fingerprints of blocks that contain text and, with a
+    `template`, the outermost block elements whose fingerprint is in it.
+    """
+    fingerprints = set()
+    stack = []  # [hash, has_text, matched descendants] per open element
+    for event, element in etree.iterwalk(tree, events=('start', 'end')):
+        is_element = isinstance(element.tag, str)
+        if event == 'start':
+            text = _normalized(element.text) if is_element else b''
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(element.tag.encode('utf-8') if is_element else b'')
+            digest.update(b'\0' + text)
+            stack.append([digest, bool(text), []])
+            continue
+        digest, has_text, matched = stack.pop()
+        fingerprint = digest.digest()
+        if is_element and has_text and element.tag in _BLOCK_TAGS:
+            fingerprints.add(fingerprint)
+            if template is not None and fingerprint in template:
+                # Nested template blocks go with this one
+                matched = [element]
+        if not stack:
+            return fingerprints, matched
+        parent = stack[-1]
+        tail = _normalized(element.tail)
+        if is_element:
+            parent[0].update(b'\1' + fingerprint)
+        parent[0].update(b'\2' + tail)
+        parent[1] = parent[1] or has_text or bool(tail)
+        parent[2].extend(matched)
+    return fingerprints, []
+
+
+def _remove(tree, template: FrozenSet[bytes]) -> int:
+    _, removed = _scan(tree, template)
+    for element in removed:
+        element.drop_tree()
+    return len(removed)
+
+
+def strip_template(html, template: Optional[FrozenSet[bytes]]):
+    """
+    `html` parsed, without the blocks of a template from TemplateFilter.template;
+    `html` itself if there is no template or it does not parse. Used by LID
+    worker processes, which get the template from the parent with each page.
+    """
+    if not template or html is None:
+        return html
+    tree = load_html(html)
+    if tree is None:
+        return html
+    _remove(tree, template)
+    return tree
+
+
+class TemplateFilter:
+    """
+    Per-host page templates: DOM blocks (menus, headers, footers, sidebars)
+    that repeat across the pages of a site.
+
+    The first `learn_pages` distinct pages of a host are only fingerprinted:
+    every block element is hashed by tag and normalized text (see `_scan`).
+    Blocks found on at least `min_share` of those pages become the host's
+    template, and `clean` drops them from every later page of the host before
+    extraction and LID. Hosts are kept in an LRU of `max_hosts` entries.
+
+    `clean` returns the parsed tree, which both trafilatura and
+    text_extractor.fast_text accept, so pages are still parsed only once.
+    Learning happens in the process that owns the filter; LID worker
+    processes get the learned blocks from `template` with each page and
+    apply them with `strip_template`.
+    """
+
+    def __init__(self, learn_pages: int = 5, min_share: float = 0.6, max_hosts: int = 10000):
+        self.learn_pages = learn_pages
+        self.min_share = min_share
+        self.max_hosts = max_hosts
+        self.pages_cleaned = 0
+        self.blocks_removed = 0
+        self._hosts = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['TemplateFilter']:
+        """Build the filter from `language_detector.templates`, or None if it is disabled."""
+        templates = config['language_detector'].get('templates') or {}
+        if not templates.get('enabled', False):
+            return None
+        return cls(
+            learn_pages=templates.get('learn_pages', 5),
+            min_share=templates.get('min_share', 0.6),
+            max_hosts=templates.get('max_hosts', 10000)
+        )
+
+    def _host(self, host: str) -> _HostTemplate:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostTemplate()
+            if len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        else:
+            self._hosts.move_to_end(host)
+        return state
+
+    def _learn(self, state: _HostTemplate, url: str, tree) -> None:
+        fingerprints, _ = _scan(tree)
+        with self._lock:
+            if state.blocks is not None or url in state.urls:
+                return
+            state.urls.add(url)
+            state.counts.update(fingerprints)
+            if len(state.urls) >= self.learn_pages:
+                needed = self.min_share * len(state.urls)
+                state.blocks = frozenset(fp for fp, count in state.counts.items() if count >= needed)
+                state.counts = None
+
+    def template(self, url: str, html=None) -> Optional[FrozenSet[bytes]]:
+        """
+        Fingerprints of the template blocks of `url`'s host, or None while the
+        host is still being learned; `html` (a page or an already parsed tree)
+        is learned from first if that is the case.
+        """
+        with self._lock:
+            state = self._host(host_of(url))
+            blocks = state.blocks
+        if blocks is None and html is not None:
+            tree = load_html(html)
+            if tree is not None:
+                self._learn(state, url, tree)
+                blocks = state.blocks
+        return blocks
+
+    def clean(self, url: str, html):
+        """`html` parsed, without the host's template blocks once they are known; `html` itself if it does not parse."""
+        tree = load_html(html)
+        if tree is None:
+            return html
+        blocks = self.template(url, tree)
+        if not blocks:
+            return tree
+        removed = _remove(tree, blocks)
+        with self._lock:
+            self.pages_cleaned += 1
+            self.blocks_removed += removed
+        return tree
+
+    def stats(self) -> str:
+        with self._lock:
+            learned = sum(1 for state in self._hosts.values() if state.blocks)
+            return (f"Templates: {learned} of {len(self._hosts)} hosts with a template, "
+                    f"{self.blocks_removed} blocks removed from {self.pages_cleaned} pages")
@@ -0,0 +1,145 @@
+from typing import Any, Dict, Optional, Tuple
+
+from lxml import etree
+from trafilatura import extract
+
+TIER_FAST = "fast"
+TIER_FULL = "full"
+
+# Subtrees that never hold main text
+_SKIPPED_TAGS = frozenset({
+    'head', 'script', 'style', 'noscript', 'template', 'svg', 'math', 'iframe', 'object', 'canvas',
+    'nav', 'header', 'footer', 'aside', 'form', 'button', 'select', 'textarea', 'label',
+})
+# Elements that start a new text block
+_BLOCK_TAGS = frozenset({
+    'body', 'main', 'article', 'section', 'div', 'p', 'blockquote', 'pre', 'address', 'center',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'table', 'tr', 'td', 'th', 'caption', 'figure', 'figcaption', 'br', 'hr',
+})
+
+
+class _TextTarget:
+    """lxml parser target that splits visible text into blocks and keeps the text-dense ones."""
+
+    def __init__(self, min_block_chars: int, max_link_density: float):
+        self.min_block_chars = min_block_chars
+        self.max_link_density = max_link_density
+        self.blocks = []
+        self._parts = []
+        self._link_chars = 0
+        self._skip_depth = 0
+        self._link_depth = 0
+
+    def _flush(self):
+        text = ' '.join(''.join(self._parts).split())
+        if len(text) >= self.min_block_chars and self._link_chars <= self.max_link_density * len(text):
+            self.blocks.append(text)
+        self._parts = []
+        self._link_chars = 0
+
+    def start(self, tag, attrib):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+        elif tag == 'a':
+            self._link_depth += 1
+
+    def end(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+        elif tag == 'a':
+            self._link_depth = max(self._link_depth - 1, 0)
+
+    def data(self, data):
+        if self._skip_depth:
+            return
+        self._parts.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+
+    def close(self) -> str:
+        self._flush()
+        return '\n'.join(self.blocks)
+
+
+def _empty(html) -> bool:
+    return html is None or (isinstance(html, (str, bytes)) and not html)
+
+
+def _walk(tree, target) -> None:
+    """Feed an already parsed tree to a parser target, in document order."""
+    for event, element in etree.iterwalk(tree, events=('start', 'end')):
+        # Comments and processing instructions have no string tag; only their tail is text
+        is_element = isinstance(element.tag, str)
+        if event == 'start':
+            if is_element:
+                target.start(element.tag, element.attrib)
+                if element.text:
+                    target.data(element.text)
+        else:
+            if is_element:
+                target.end(element.tag)
+            if element.tail and element is not tree:
+                target.data(element.tail)
+
+
+def fast_text(html, min_block_chars: int = 30, max_link_density: float = 0.5) -> str:
+    """
+    Visible text of a page in one streaming lxml pass, without building a tree
+    (an already parsed tree, e.g. from TemplateFilter.clean, is walked instead).
+
+    Script, style, navigation, header, footer, aside and form subtrees are
+    skipped. The rest is split into blocks at block-level elements; blocks
+    shorter than `min_block_chars` or with more than `max_link_density` of
+    their characters inside links are dropped as boilerplate.
+    """
+    if _empty(html):
+        return ''
+    target = _TextTarget(min_block_chars, max_link_density)
+    if isinstance(html, etree._Element):
+        _walk(html, target)
+        return target.close()
+    parser = etree.HTMLParser(target=target, recover=True, no_network=True)
+    try:
+        parser.feed(html)
+        return parser.close()
+    except etree.LxmlError:
+        return target.close()
+
+
+class TieredExtractor:
+    """
+    Text for LID from the cheap `fast_text` pass, with trafilatura as the
+    fallback when the pass finds fewer than `min_chars` characters.
+
+    `lid_text` returns `(text, tier)`. Only TIER_FULL text is trafilatura
+    output; callers that save text extract accepted pages again when the
+    fast tier settled them.
+    """
+
+    def __init__(self, min_chars: int = 200, min_block_chars: int = 30, max_link_density: float = 0.5):
+        self.min_chars = min_chars
+        self.min_block_chars = min_block_chars
+        self.max_link_density = max_link_density
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['TieredExtractor']:
+        """Build the extractor from `language_detector.fast_extraction`, or None if it is disabled."""
+        extraction = config['language_detector'].get('fast_extraction') or {}
+        if not extraction.get('enabled', False):
+            return None
+        return cls(
+            min_chars=extraction.get('min_chars', 200),
+            min_block_chars=extraction.get('min_block_chars', 30),
+            max_link_density=extraction.get('max_link_density', 0.5)
+        )
+
+    def lid_text(self, html) -> Tuple[Optional[str], str]:
+        text = fast_text(html, self.min_block_chars, self.max_link_density)
+        if len(text) >= self.min_chars:
+            return text, TIER_FAST
+        return None if _empty(html) else extract(html), TIER_FULL
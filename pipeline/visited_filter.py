@@ -0,0 +1,157 @@
+import base64
+import hashlib
+import math
+import sys
+import zlib
+from typing import Any, Dict, Iterable, Tuple
+
+
+def _hash_pair(url: str) -> Tuple[int, int]:
+    digest = hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    # Double hashing: index_i = h1 + i * h2, with h2 odd so it cycles through all bits
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for `capacity` items at `error_rate`."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _indexes(self, h1: int, h2: int):
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def contains_hashed(self, h1: int, h2: int) -> bool:
+        bits = self.bits
+        return all(bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(h1, h2))
+
+    def add_hashed(self, h1: int, h2: int) -> None:
+        bits = self.bits
+        for index in self._indexes(h1, h2):
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """
+    Set-like membership filter for URLs whose size is not known in advance.
+
+    When the current Bloom filter reaches its capacity a new one is added,
+    `growth` times larger and with an error rate tightened by `tightening`,
+    so the overall false-positive rate stays below `error_rate` (Almeida et
+    al., "Scalable Bloom Filters", 2007). A false positive means a URL is
+    treated as already seen and is not crawled; nothing is ever reported
+    missing that was added.
+    """
+
+    def __init__(self, initial_capacity: int = 100000, error_rate: float = 0.001,
+                 growth: int = 2, tightening: float = 0.5):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters = []
+        self.count = 0
+
+    def _add_filter(self) -> BloomFilter:
+        n = len(self.filters)
+        bloom = BloomFilter(
+            self.initial_capacity * self.growth ** n,
+            self.error_rate * (1 - self.tightening) * self.tightening ** n
+        )
+        self.filters.append(bloom)
+        return bloom
+
+    def __contains__(self, url: str) -> bool:
+        h1, h2 = _hash_pair(url)
+        return any(bloom.contains_hashed(h1, h2) for bloom in reversed(self.filters))
+
+    def add(self, url: str) -> None:
+        h1, h2 = _hash_pair(url)
+        if any(bloom.contains_hashed(h1, h2) for bloom in reversed(self.filters)):
+            return
+        bloom = self.filters[-1] if self.filters and not self.filters[-1].is_full else self._add_filter()
+        bloom.add_hashed(h1, h2)
+        self.count += 1
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def memory_usage(self) -> int:
+        return sys.getsizeof(self) + sum(sys.getsizeof(bloom.bits) for bloom in self.filters)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "initial_capacity": self.initial_capacity,
+            "error_rate": self.error_rate,
+            "growth": self.growth,
+            "tightening": self.tightening,
+            "count": self.count,
+            "filters": [
+                [bloom.count, base64.b64encode(zlib.compress(bytes(bloom.bits))).decode('ascii')]
+                for bloom in self.filters
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'ScalableBloomFilter':
+        url_filter = cls(state['initial_capacity'], state['error_rate'], state['growth'], state['tightening'])
+        for count, bits in state['filters']:
+            bloom = url_filter._add_filter()
+            bloom.bits = bytearray(zlib.decompress(base64.b64decode(bits)))
+            bloom.count = count
+        url_filter.count = state['count']
+        return url_filter
+
+
+def new_url_set(crawler_config: Dict[str, Any]):
+    """Visited-set backend selected by `seed_crawler.visited_backend`: an exact set or a Bloom filter."""
+    if crawler_config.get('visited_backend', 'set') == 'bloom':
+        return ScalableBloomFilter(
+            initial_capacity=crawler_config.get('bloom_initial_capacity', 100000),
+            error_rate=crawler_config.get('bloom_error_rate', 0.001)
+        )
+    return set()
+
+
+def url_set_state(url_set):
+    """JSON-serializable form of a visited set, for checkpoints."""
+    if isinstance(url_set, ScalableBloomFilter):
+        return {"bloom": url_set.to_state()}
+    return list(url_set)
+
+
+def url_set_from_state(state, crawler_config: Dict[str, Any]):
+    if isinstance(state, dict) and 'bloom' in state:
+        return ScalableBloomFilter.from_state(state['bloom'])
+    url_set = new_url_set(crawler_config)
+    url_set.update(state)
+    return url_set
+
+
+def url_set_memory(url_set) -> int:
+    """Approximate bytes held by a visited set, including the URL strings of an exact set."""
+    if isinstance(url_set, ScalableBloomFilter):
+        return url_set.memory_usage()
+    return sys.getsizeof(url_set) + sum(sys.getsizeof(url) for url in url_set)
+
+
+def memory_report(name: str, url_set) -> str:
+    memory = url_set_memory(url_set)
+    per_million = memory / len(url_set) * 1e6 if len(url_set) else 0
+    backend = 'bloom' if isinstance(url_set, ScalableBloomFilter) else 'set'
+    return (f"{name} ({backend}): {len(url_set)} URLs, {memory / 1e6:.1f} MB, "
+            f"{per_million / 1e6:.1f} MB per million URLs")
@@ -1,4 +1,5 @@
 import os
+import sys
 import yaml
 import json
 from typing import List, Dict, Any
@@ -6,6 +7,9 @@ import requests
 from urllib.parse import urlparse
 from tqdm import tqdm
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pipeline'))
+from page_store import PageStore
+
 # Load configuration from a YAML file
 def load_config(config_file: str) -> Dict[str, Any]:
     with open(config_file, 'r') as file:
@@ -17,13 +21,32 @@ def load_data(code: str, meta_data_dir: str) -> Dict[str, Any]:
     with open(meta_file_name, 'r', encoding='utf-8') as file:
         return json.load(file)
 
+# Parse robots.txt for CCBot rules
+def robots_blocks_ccbot(robots_txt: str) -> bool:
+    user_agent = None
+
+    for line in robots_txt.splitlines():
+        line = line.strip()
+        if line.startswith("User-agent:"):
+            user_agent = line.split(":")[1].strip()
+        elif user_agent == "CCBot" and line.startswith("Disallow:"):
+            path = line.split(":")[1].strip()
+            if path == "/":
+                return True
+        elif user_agent == "CCBot" and line.startswith("Allow:"):
+            path = line.split(":")[1].strip()
+            if path == "/":
+                return False
+    return False
+
 # Check if a website's robots.txt file blocks CCBot
-def is_ccbot_blocked(url: str) -> bool:
+def is_ccbot_blocked(url: str, page_store: PageStore = None) -> bool:
     """
     Check if a website's robots.txt file blocks CCBot.
 
     Parameters:
         url (str): The URL or domain to check.
+        page_store (PageStore): Optional store to read robots.txt from before going to the network.
 
     Returns:
         bool: True if CCBot is blocked, False otherwise.
@@ -32,46 +55,35 @@ def is_ccbot_blocked(url: str) -> bool:
     domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
     robots_url = f"{domain}/robots.txt"
 
+    stored = page_store.get(robots_url) if page_store is not None else None
+    if stored is not None:
+        return stored.status < 400 and robots_blocks_ccbot(stored.text)
+
     try:
         response = requests.get(robots_url, timeout=5)
+        if page_store is not None:
+            page_store.put(robots_url, response.content, response.headers, response.status_code)
         response.raise_for_status()
-
-        # Parse robots.txt for CCBot rules
-        lines = response.text.splitlines()
-        user_agent = None
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("User-agent:"):
-                user_agent = line.split(":")[1].strip()
-            elif user_agent == "CCBot" and line.startswith("Disallow:"):
-                path = line.split(":")[1].strip()
-                if path == "/":
-                    return True
-            elif user_agent == "CCBot" and line.startswith("Allow:"):
-                path = line.split(":")[1].strip()
-                if path == "/":
-                    return False
-        return False
+        return robots_blocks_ccbot(response.text)
     except requests.RequestException:
         return False  # Assume not blocked if robots.txt is inaccessible
 
 # Remove sites blocked by CCBot from the dataset
-def remove_cc_blocked_site(lang_code: str, meta_data_dir: str) -> Dict[str, Any]:
+def remove_cc_blocked_site(lang_code: str, meta_data_dir: str, page_store: PageStore = None) -> Dict[str, Any]:
     data = load_data(lang_code, meta_data_dir)
     sites = data.get('Sites', [])
-    data['Sites'] = [site for site in sites if not is_ccbot_blocked(site['Site URL'])]
+    data['Sites'] = [site for site in sites if not is_ccbot_blocked(site['Site URL'], page_store)]
     return data
 
 # Process files and save cleaned data
 
 
 # Process files and save cleaned data
-def process_files(input_label: str, meta_data_dir: str, output_dir: str) -> None:
+def process_files(input_label: str, meta_data_dir: str, output_dir: str, page_store: PageStore = None) -> None:
     os.makedirs(output_dir, exist_ok=True)
 
     print(f"Processing input label: {input_label}")
-    cleaned_data = remove_cc_blocked_site(input_label, meta_data_dir)
+    cleaned_data = remove_cc_blocked_site(input_label, meta_data_dir, page_store)
     output_path = os.path.join(output_dir, f"{input_label}.json")
 
     with open(output_path, 'w', encoding='utf-8') as file:
@@ -83,6 +95,7 @@ if __name__ == "__main__":
     config = load_config('pipeline/config.yaml')
     meta_data_dir = config['output']['formated_directory']
     output_dir = config['output']['cleaned_directory']
+    page_store = PageStore.from_config(config)
 
     # Determine input labels
     if config['batch_processing']['enabled']:
@@ -93,5 +106,5 @@ if __name__ == "__main__":
     
     # Process and save cleaned data with tqdm
     for input_label in tqdm(input_labels, desc="Processing input labels"):
-        process_files(input_label, meta_data_dir, output_dir)
+        process_files(input_label, meta_data_dir, output_dir, page_store)
 